@@ -0,0 +1,49 @@
+"""Benchmark of hyccup.batch.render_many.
+
+Render product pages in the current process and in pools of processes, and
+report the throughput and the jobs done by each worker::
+
+    poetry run python benchmarks/bench_batch.py
+    poetry run python benchmarks/bench_batch.py --jobs 20000 --workers 4 --workers 8
+"""
+import argparse
+import os
+
+from hyccup.batch import Job, render_many
+from hyccup.page import html5
+
+
+def product_page(product_id):
+    """A product page of about 30 elements."""
+    return html5(
+        ["head", ["title", f"Product {product_id}"]],
+        [
+            "body",
+            ["h1", f"Product {product_id}"],
+            ["ul.specs", (["li", f"Spec {i}: {product_id * i}"] for i in range(20))],
+            ["p.price", f"{product_id % 100}.99 €"],
+        ],
+        lang="en",
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--workers", type=int, action="append")
+    parser.add_argument("--chunksize", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    jobs = [Job(product_page, (product_id,)) for product_id in range(args.jobs)]
+    for workers in args.workers or (0, os.cpu_count()):
+        batch = render_many(jobs, workers=workers, chunksize=args.chunksize)
+        stats = batch.run()
+        print(
+            f"workers: {workers or 'none':>4}  {stats.throughput:10.0f} docs/s  "
+            f"{stats.seconds:6.2f} s  "
+            f"jobs per worker: {sorted(w.jobs for w in stats.workers.values())}"
+        )
+
+
+if __name__ == "__main__":
+    main()
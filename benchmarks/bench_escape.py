@@ -0,0 +1,65 @@
+"""Micro-benchmark of hyccup.util.escape_html.
+
+Compare the current implementation to the previous one (five chained
+``str.replace`` calls) on clean, lightly dirty and heavily dirty strings, from
+a checkout with the package installed (``poetry install``), or with the root
+of the checkout in ``PYTHONPATH``::
+
+    poetry run python benchmarks/bench_escape.py
+"""
+import timeit
+
+from hyccup.util import escape_html
+
+
+def escape_html_chained(string, mode, escape_strings):
+    """Previous implementation of escape_html, kept as reference."""
+    if not escape_strings:
+        return string
+
+    return (
+        string.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+        .replace("'", "&#39;" if str(mode) == "sgml" else "&apos;")
+    )
+
+
+INPUTS = {
+    "clean short": "Hello world",
+    "clean long": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20,
+    "light dirty": "Tom & Jerry's show",
+    "heavy dirty": "<a href=\"/?a=1&b=2\">Rock'n'roll</a>" * 20,
+}
+
+IMPLEMENTATIONS = {
+    "chained": escape_html_chained,
+    "current": escape_html,
+}
+
+
+def bench(function, string, mode, number=100_000, repeat=5):
+    """Return the best time of a call in nanoseconds."""
+    timer = timeit.Timer(lambda: function(string, mode, True))
+    return min(timer.repeat(number=number, repeat=repeat)) / number * 1e9
+
+
+def main():
+    for mode in ("xhtml", "sgml"):
+        print(f"mode: {mode}")
+        for label, string in INPUTS.items():
+            results = {
+                name: bench(function, string, mode)
+                for name, function in IMPLEMENTATIONS.items()
+            }
+            assert escape_html(string, mode, True) == escape_html_chained(
+                string, mode, True
+            )
+            timings = "  ".join(f"{name}: {t:8.1f} ns" for name, t in results.items())
+            speedup = results["chained"] / results["current"]
+            print(f"  {label:12} {timings}  (x{speedup:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark of the import time of Hyccup modules.
+
+Each module is imported in a fresh interpreter, several times. Report the
+median import time and whether Hy and asyncio were loaded by the import.
+The import time of Hy itself is reported for comparison::
+
+    poetry run python benchmarks/bench_import.py
+    poetry run python benchmarks/bench_import.py --module hyccup.form --repeat 50
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+MODULES = ("hyccup", "hyccup.core", "hyccup.form", "hyccup.page", "hy")
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, "hy" in sys.modules, "asyncio" in sys.modules)
+"""
+
+
+def measure(module, repeat):
+    """Return the median import time of module and the loaded modules."""
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT.format(module=module)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        times.append(float(output[0]))
+    return statistics.median(times), output[1] == "True", output[2] == "True"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", action="append")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    for module in args.module or MODULES:
+        seconds, hy_loaded, asyncio_loaded = measure(module, args.repeat)
+        print(
+            f"{module:14} {seconds * 1000:8.1f} ms  "
+            f"hy loaded: {hy_loaded!s:5}  asyncio loaded: {asyncio_loaded}"
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
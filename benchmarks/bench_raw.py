@@ -0,0 +1,67 @@
+"""Benchmark of raw strings built from many fragments.
+
+Compare, for 1k, 10k and 100k fragments, the current ``raw`` to the previous
+implementation (``reduce`` of raw string additions, quadratic) and to a
+:class:`hyccup.util.RawBuilder` filled fragment by fragment. The previous
+implementation is only run up to ``--max-reference`` fragments::
+
+    poetry run python benchmarks/bench_raw.py
+    poetry run python benchmarks/bench_raw.py --max-reference 100000
+"""
+import argparse
+import timeit
+from functools import reduce
+from operator import add
+
+from hyccup.core import raw
+from hyccup.util import RawBuilder, RawStr, is_coll
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def raw_reduce(obj):
+    """Previous implementation of raw, kept as reference."""
+    if obj is None:
+        return RawStr("")
+
+    if is_coll(obj):
+        return reduce(add, map(raw_reduce, obj))
+
+    return RawStr(obj)
+
+
+def raw_builder(fragments):
+    builder = RawBuilder()
+    for fragment in fragments:
+        builder.append(fragment)
+    return builder.build()
+
+
+def bench(function, fragments, repeat):
+    """Return the best time of a call in milliseconds."""
+    timer = timeit.Timer(lambda: function(fragments))
+    return min(timer.repeat(number=1, repeat=repeat)) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-reference", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    implementations = {"raw": raw, "builder": raw_builder, "reduce": raw_reduce}
+    for size in SIZES:
+        fragments = [f'<tr><td class="cell">{i}</td></tr>' for i in range(size)]
+        results = []
+        for name, function in implementations.items():
+            if name == "reduce" and size > args.max_reference:
+                results.append(f"{name}: {'skipped':>10}")
+                continue
+            milliseconds = bench(function, fragments, args.repeat)
+            per_fragment = milliseconds / size * 1e6
+            results.append(f"{name}: {milliseconds:8.2f} ms ({per_fragment:5.0f} ns)")
+        print(f"{size:>7} fragments  " + "  ".join(results))
+
+
+if __name__ == "__main__":
+    main()
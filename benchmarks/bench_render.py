@@ -0,0 +1,284 @@
+"""Benchmarks of the rendering of representative documents.
+
+Each workload is built and rendered in every mode. For each run, report:
+
+* the number of operations (build and render) per second,
+* the time per rendered element in nanoseconds,
+* the peak of the memory traced by tracemalloc during a render, in bytes.
+  Python has no counter of the allocations of a call, and the blocks still
+  traced after a render are only its output, so the peak of the memory
+  allocated by a render is reported instead of an allocation count.
+
+Run it from a checkout with the package installed (``poetry install``), or
+with the root of the checkout in ``PYTHONPATH``. Results can be written as
+JSON and compared with a previous run::
+
+    poetry run python benchmarks/bench_render.py --json before.json
+    # ... change some code ...
+    poetry run python benchmarks/bench_render.py --json after.json --compare before.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from collections.abc import Iterator
+from datetime import datetime, timezone
+
+from hyccup import html
+from hyccup.builder import h
+from hyccup.compiler import Element
+from hyccup.form import FieldGroup, OptionList, SelectedOptions, drop_down
+from hyccup.page import html4, html5, include_css, include_js, xhtml
+
+MODES = ("html", "xhtml", "xml", "sgml")
+
+
+def deep_nesting(depth=200):
+    """A single branch of nested elements."""
+    tree = ["span", "leaf"]
+    for level in range(depth):
+        tree = ["div", {"class": f"level-{level}", "data-level": level}, tree, "text"]
+    return (tree,)
+
+
+def wide_list(size=10_000):
+    """A list of many items."""
+    return (
+        ["ul#items.list", *(["li.item", f"Item #{i} & more"] for i in range(size))],
+    )
+
+
+def wide_elements(size=10_000):
+    """The wide list, built with Element nodes."""
+    return (
+        h("ul#items.list", *(h("li.item", f"Item #{i} & more") for i in range(size))),
+    )
+
+
+def form(rows=100):
+    """An attribute-heavy form built with field groups."""
+    options = [(f"Option {i}", i) for i in range(20)]
+
+    def row(group, i):
+        with group.group(f"row-{i}") as g:
+            return [
+                "div.form-row",
+                g.label({"class": "form-label"}, "name", f"Name #{i}"),
+                g.text_field({"class": "form-control", "required": True}, "name"),
+                g.check_box({"class": "form-check"}, "active", i % 2 == 0),
+                g.drop_down({"class": "form-select"}, "choice", options, i % 20),
+                g.text_area({"rows": 3}, "notes", "Some <notes>"),
+            ]
+
+    group = FieldGroup("grid")
+    return (
+        [
+            "form",
+            {"method": "POST", "action": "/submit"},
+            *(row(group, i) for i in range(rows)),
+        ],
+    )
+
+
+COUNTRIES = OptionList((f"Country #{i} & co", f"c{i}") for i in range(5000))
+
+
+def select(options=COUNTRIES):
+    """A drop-down of many options rendered once."""
+    return (drop_down({"class": "form-select"}, "country", options, "c2500"),)
+
+
+def page_content(articles=50):
+    """The content of a typical page."""
+    return (
+        [
+            "head",
+            ["title", "A page"],
+            *include_css("/main.css"),
+            *include_js("/main.js"),
+        ],
+        [
+            "body",
+            [
+                "header#top.container",
+                ["h1", "Title"],
+                ["nav", *(["a", {"href": f"/{i}"}, f"Link {i}"] for i in range(10))],
+            ],
+            [
+                "main.container",
+                *(
+                    [
+                        "article",
+                        {"id": f"article-{i}"},
+                        ["h2", f"Article {i}"],
+                        [
+                            "p",
+                            "Lorem ipsum dolor sit amet, <consectetur> adipiscing elit.",
+                        ],
+                    ]
+                    for i in range(articles)
+                ),
+            ],
+            ["footer", ["p", "© Hyccup"]],
+        ],
+    )
+
+
+PAGES = {
+    "html": html5,
+    "xhtml": xhtml,
+    "xml": lambda *content: html5(*content, xml=True),
+    "sgml": html4,
+}
+
+
+def render_page(mode):
+    return PAGES[mode](*page_content())
+
+
+def render_content(build):
+    return lambda mode: html(*build(), mode=mode)
+
+
+WORKLOADS = {
+    "deep": (render_content(deep_nesting), deep_nesting),
+    "wide": (render_content(wide_list), wide_list),
+    "wide-h": (render_content(wide_elements), wide_elements),
+    "form": (render_content(form), form),
+    "select": (render_content(select), select),
+    "page": (render_page, page_content),
+}
+"""Workloads: function rendering a document and function building its content."""
+
+
+def count_elements(exp):
+    """Count the elements of a data structure, options of option lists included."""
+    if isinstance(exp, list) and exp and isinstance(exp[0], str):
+        return 1 + sum(map(count_elements, exp[1:]))
+    if isinstance(exp, Element):
+        return 1 + sum(map(count_elements, exp.children))
+    if isinstance(exp, (list, tuple, Iterator)):
+        return sum(map(count_elements, exp))
+    if isinstance(exp, SelectedOptions):
+        return count_options(exp.options.coll)
+    return 0
+
+
+def count_options(coll):
+    """Count the options and the option groups of a collection of options."""
+    count = 0
+    for opt in coll:
+        match opt:
+            case [_, [*sub_opts]]:
+                count += 1 + count_options(sub_opts)
+            case _:
+                count += 1
+    return count
+
+
+def measure_peak_memory(function):
+    """Return the peak of the memory traced while calling function, in bytes."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(workloads, modes, min_time):
+    results = []
+    for name in workloads:
+        render, build = WORKLOADS[name]
+        elements = count_elements(build())
+        for mode in modes:
+            operation = lambda: render(mode)
+            timer = timeit.Timer(operation)
+            number, _ = timer.autorange()
+            number = max(1, int(number * min_time / 0.2))
+            seconds = min(timer.repeat(number=number, repeat=3)) / number
+            results.append(
+                {
+                    "workload": name,
+                    "mode": mode,
+                    "elements": elements,
+                    "ops_per_sec": 1 / seconds,
+                    "ns_per_element": seconds * 1e9 / elements,
+                    "peak_traced_bytes": measure_peak_memory(operation),
+                }
+            )
+            print_result(results[-1])
+    return results
+
+
+def print_result(result, previous=None):
+    line = (
+        f"{result['workload']:6} {result['mode']:6} "
+        f"{result['ops_per_sec']:10.1f} ops/s "
+        f"{result['ns_per_element']:10.1f} ns/elem "
+        f"{result['peak_traced_bytes'] / 1024:10.1f} KiB peak traced"
+    )
+    if previous:
+        ratio = result["ops_per_sec"] / previous["ops_per_sec"]
+        line += f"  x{ratio:.2f} ops/s"
+    print(line)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous_path):
+    with open(previous_path) as f:
+        previous = {(r["workload"], r["mode"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared to {previous_path}:")
+    for result in results:
+        key = (result["workload"], result["mode"])
+        if key in previous:
+            print_result(result, previous[key])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workload", action="append", choices=WORKLOADS)
+    parser.add_argument("--mode", action="append", choices=MODES)
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="seconds per timing"
+    )
+    parser.add_argument("--json", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    args = parser.parse_args(argv)
+
+    results = run(args.workload or list(WORKLOADS), args.mode or MODES, args.min_time)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {
+                    "revision": git_revision(),
+                    "date": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
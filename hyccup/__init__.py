@@ -1,4 +1,4 @@
-import hy
-
 from hyccup.core import html
 from hyccup.core import raw
+from hyccup.util import attrs
+from hyccup.tracing import profile
@@ -0,0 +1,318 @@
+"""Rendering of many documents in a pool of processes."""
+import functools
+import hashlib
+import importlib
+import json
+import os
+import time
+from collections import deque, namedtuple
+
+from hyccup.core import html
+
+Job = namedtuple(
+    "Job", ["component", "args", "kwargs", "name"], defaults=((), None, None)
+)
+"""Rendering of ``component(*args, **kwargs)``, written to the file name.
+
+``component`` is a function or its ``"module:qualified.name"`` reference.
+"""
+
+JobResult = namedtuple("JobResult", ["name", "output", "path", "size", "skipped"])
+"""Result of a job: its output, or the path of the file it was written to."""
+
+
+class WorkerStats:
+    """Counters of a worker process."""
+
+    __slots__ = ("jobs", "seconds", "size")
+
+    def __init__(self):
+        self.jobs = 0
+        self.seconds = 0.0
+        self.size = 0
+
+    def __repr__(self):
+        return (
+            f"WorkerStats(jobs={self.jobs}, seconds={self.seconds:.3f}, "
+            f"size={self.size})"
+        )
+
+
+class BatchStats:
+    """Counters of a batch, with the statistics of each worker by process id."""
+
+    def __init__(self):
+        self.rendered = 0
+        self.skipped = 0
+        self.size = 0
+        self.seconds = 0.0
+        self.workers = {}
+
+    @property
+    def throughput(self):
+        """Number of rendered documents per second."""
+        return self.rendered / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (
+            f"BatchStats(rendered={self.rendered}, skipped={self.skipped}, "
+            f"size={self.size}, seconds={self.seconds:.3f}, "
+            f"throughput={self.throughput:.1f}/s)"
+        )
+
+
+def component_name(component):
+    """Return the ``"module:qualified.name"`` reference of a component.
+
+    Raise :class:`ValueError` if the component cannot be imported from its
+    reference, like local functions, partial objects or callable instances.
+    """
+    if isinstance(component, str):
+        return component
+    qualname = getattr(component, "__qualname__", None)
+    module = getattr(component, "__module__", None)
+    if qualname is None or module is None or "<locals>" in qualname:
+        raise ValueError(f"{component!r} cannot be imported by the workers")
+    return f"{module}:{qualname}"
+
+
+@functools.cache
+def import_component(name):
+    """Import the component referenced by ``"module:qualified.name"``."""
+    module_name, _, qualname = name.partition(":")
+    component = importlib.import_module(module_name)
+    for attribute in qualname.split("."):
+        component = getattr(component, attribute)
+    return component
+
+
+def input_hash(component, args, kwargs, options):
+    """Return the hash of the inputs of a job, from their representation."""
+    inputs = repr((component, args, sorted(kwargs.items()), sorted(options.items())))
+    return hashlib.sha256(inputs.encode()).hexdigest()
+
+
+def render_job(component, args, kwargs, name, output_dir, encoding, html_options):
+    """Render a job, in a worker, and write it to output_dir if not None.
+
+    Components returning strings, like the functions of :mod:`hyccup.page`
+    or the ones defined with :hy:func:`hyccup.definition.defhtml`, are used
+    as is. Other results are rendered with :hy:func:`hyccup.core.html`.
+
+    Return the output (None if written), its size, the time spent and the
+    process id.
+    """
+    start = time.perf_counter()
+    output = import_component(component)(*args, **kwargs)
+    if not isinstance(output, str):
+        output = html(output, **html_options)
+    size = len(output)
+    if output_dir is not None:
+        path = os.path.join(output_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding=encoding, newline="") as f:
+            f.write(output)
+        os.replace(temporary_path, path)
+        output = None
+    return output, size, time.perf_counter() - start, os.getpid()
+
+
+def _render_job(task):
+    return render_job(*task)
+
+
+class Batch:
+    """Jobs rendered by :func:`render_many`.
+
+    Iterating over the batch renders the jobs and yields their
+    :data:`JobResult`, in the order of the jobs. :attr:`stats` is updated as
+    the results are received.
+    """
+
+    def __init__(
+        self,
+        jobs,
+        workers=None,
+        chunksize=16,
+        output_dir=None,
+        manifest=None,
+        encoding="utf-8",
+        version="",
+        html_options=None,
+    ):
+        self.jobs = jobs
+        self.workers = workers
+        self.chunksize = chunksize
+        self.output_dir = output_dir
+        if manifest is None and output_dir is not None:
+            manifest = os.path.join(output_dir, ".hyccup-manifest.json")
+        self.manifest = manifest
+        self.encoding = encoding
+        self.version = version
+        self.html_options = {} if html_options is None else html_options
+        self.stats = BatchStats()
+
+    def load_manifest(self):
+        """Return the input hashes of the previous run, by job key."""
+        if self.manifest is None:
+            return {}
+        try:
+            with open(self.manifest, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self, hashes):
+        temporary_path = f"{self.manifest}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(self.manifest)), exist_ok=True)
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(hashes, f, indent=0, sort_keys=True)
+        os.replace(temporary_path, self.manifest)
+
+    def is_up_to_date(self, key, job_hash, name, previous_hashes):
+        if previous_hashes.get(key) != job_hash:
+            return False
+        return self.output_dir is None or os.path.exists(self.output_path(name))
+
+    def tasks(self, jobs, previous_hashes, hashes):
+        """Yield the tasks of the jobs to render, and record them in jobs.
+
+        jobs receives the name, the manifest key and the input hash of each
+        job, the key being None if the job is skipped.
+        """
+        options = {
+            **self.html_options,
+            "version": self.version,
+            "encoding": self.encoding,
+        }
+        for job in self.jobs:
+            if not isinstance(job, Job):
+                job = Job(*job)
+            if self.output_dir is not None and job.name is None:
+                raise ValueError(f"{job} has no name to write it in output_dir")
+            component = component_name(job.component)
+            kwargs = {} if job.kwargs is None else job.kwargs
+            job_hash = input_hash(component, job.args, kwargs, options)
+            key = job_hash if job.name is None else job.name
+            if self.is_up_to_date(key, job_hash, job.name, previous_hashes):
+                hashes[key] = job_hash
+                jobs.append((job.name, None, job_hash))
+                continue
+            jobs.append((job.name, key, job_hash))
+            yield (
+                component,
+                job.args,
+                kwargs,
+                job.name,
+                self.output_dir,
+                self.encoding,
+                self.html_options,
+            )
+
+    def __iter__(self):
+        previous_hashes = self.load_manifest()
+        hashes = {}
+        jobs = deque()
+        tasks = self.tasks(jobs, previous_hashes, hashes)
+        start = time.perf_counter()
+        executor = None
+        try:
+            if self.workers == 0:
+                results = map(_render_job, tasks)
+            else:
+                from concurrent.futures import ProcessPoolExecutor
+
+                executor = ProcessPoolExecutor(self.workers)
+                results = executor.map(_render_job, tasks, chunksize=self.chunksize)
+
+            for output, size, seconds, pid in results:
+                # skipped jobs are before the rendered one in the queue
+                name, key, job_hash = jobs.popleft()
+                while key is None:
+                    yield self.skipped_result(name)
+                    name, key, job_hash = jobs.popleft()
+                hashes[key] = job_hash
+                self.record(pid, size, seconds)
+                self.stats.seconds = time.perf_counter() - start
+                yield JobResult(name, output, self.output_path(name), size, False)
+            while jobs:
+                yield self.skipped_result(jobs.popleft()[0])
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            self.stats.seconds = time.perf_counter() - start
+            if self.manifest is not None:
+                self.save_manifest({**previous_hashes, **hashes})
+
+    def output_path(self, name):
+        """Return the path of the file of the job name, if written."""
+        return None if self.output_dir is None else os.path.join(self.output_dir, name)
+
+    def skipped_result(self, name):
+        self.stats.skipped += 1
+        return JobResult(name, None, self.output_path(name), 0, True)
+
+    def record(self, pid, size, seconds):
+        self.stats.rendered += 1
+        self.stats.size += size
+        worker = self.stats.workers.get(pid)
+        if worker is None:
+            worker = self.stats.workers[pid] = WorkerStats()
+        worker.jobs += 1
+        worker.seconds += seconds
+        worker.size += size
+
+    def run(self):
+        """Render all the jobs and return the :class:`BatchStats`."""
+        for _ in self:
+            pass
+        return self.stats
+
+
+def render_many(
+    jobs,
+    workers=None,
+    chunksize=16,
+    output_dir=None,
+    manifest=None,
+    encoding="utf-8",
+    version="",
+    **html_options,
+):
+    """Render jobs in a pool of processes.
+
+    Each job is a :data:`Job`, or a tuple of its fields, like
+    ``(component, args)``. Only the reference of the component and its
+    arguments are sent to the workers, which import the component and
+    render it. Outputs are sent back, or written to ``output_dir`` and only
+    their sizes are sent back::
+
+        >>> jobs = [Job('site.pages:product', (product_id,), name=f'p/{product_id}.html')
+        ...         for product_id in product_ids]
+        >>> stats = render_many(jobs, workers=8, output_dir='public').run()
+
+    When a manifest is used, the hashes of the inputs of the jobs are stored
+    in it, and the jobs whose inputs did not change since the last run (and
+    whose file still exists) are skipped. Inputs are hashed from their
+    ``repr``, so arguments should be plain data. Change ``version`` to
+    render everything again, after a change of the components for instance.
+
+    :param jobs: Iterable of jobs.
+    :param workers: Number of processes (default: the number of CPUs). With
+                    ``0``, jobs are rendered in the current process.
+    :param chunksize: Number of jobs sent to a worker at once.
+    :param output_dir: Directory in which the jobs are written, at the path
+                       given by their name.
+    :param manifest: Path of the manifest file (default: a
+                     ``.hyccup-manifest.json`` file of ``output_dir``, no
+                     manifest without output directory).
+    :param encoding: Encoding of the written files.
+    :param version: Version of the components, part of the input hashes.
+    :param \\*\\*html_options: Options of :hy:func:`hyccup.core.html` used
+                               when a component does not return a string.
+    :rtype: :class:`Batch`
+    """
+    return Batch(
+        jobs, workers, chunksize, output_dir, manifest, encoding, version, html_options
+    )
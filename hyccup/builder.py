@@ -0,0 +1,37 @@
+"""Builder of :class:`hyccup.compiler.Element` nodes."""
+from hyccup.compiler import Element
+
+
+class ElementBuilder:
+    """Create :class:`hyccup.compiler.Element` nodes.
+
+    Call it with a tag (abbreviation) and the content of the element, or use
+    the tag name as attribute::
+
+        >>> h("div#main.container", {"data-x": 1}, h.p("Hello"))
+        >>> h.div({"id": "main", "class": "container"}, h.p("Hello"))
+
+    Underscores of attribute names are replaced by dashes, a trailing one is
+    removed: ``h.my_element`` creates ``<my-element>`` and ``h.del_`` creates
+    ``<del>``.
+    """
+
+    def __call__(self, tag, *content):
+        return Element(tag, *content)
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        tag = name.rstrip("_").replace("_", "-")
+
+        def build(*content):
+            return Element(tag, *content)
+
+        build.__name__ = build.__qualname__ = name
+        # store the function, so that __getattr__ is only called once per tag
+        setattr(self, name, build)
+        return build
+
+
+h = ElementBuilder()
+"""Default :class:`ElementBuilder`."""
@@ -0,0 +1,296 @@
+"""Caching of rendered fragments."""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from hyccup.compiler import Node
+from hyccup.deferred import without_deferred_slots
+from hyccup.util import RawStr
+
+
+class CacheStats:
+    """Counters of a fragment cache."""
+
+    __slots__ = ("hits", "misses", "evictions")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        return (
+            f"CacheStats(hits={self.hits}, misses={self.misses}, "
+            f"evictions={self.evictions})"
+        )
+
+
+class FragmentCache:
+    """Base class of the backends storing rendered fragments.
+
+    Subclasses implement :meth:`load`, :meth:`store` and :meth:`delete`.
+    Expiration and statistics are handled by :meth:`get` and :meth:`set`.
+
+    :param clock: Function returning the current time in seconds
+                  (default: :func:`time.time`).
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.stats = CacheStats()
+
+    def get(self, key):
+        """Return the fragment stored at key, or None if missing or expired."""
+        entry = self.load(key)
+        if entry is not None:
+            expires, value = entry
+            if expires is None or expires > self.clock():
+                self.stats.hits += 1
+                return value
+            self.delete(key)
+            self.stats.evictions += 1
+        self.stats.misses += 1
+        return None
+
+    def set(self, key, value, ttl=None):
+        """Store the fragment value at key, for ttl seconds if not None."""
+        expires = None if ttl is None else self.clock() + ttl
+        self.store(key, (expires, value))
+
+    def load(self, key):
+        """Return the ``(expires, value)`` entry stored at key, or None."""
+        raise NotImplementedError
+
+    def store(self, key, entry):
+        """Store the ``(expires, value)`` entry at key."""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove the entry stored at key."""
+        raise NotImplementedError
+
+
+class MemoryCache(FragmentCache):
+    """In-process cache evicting the least recently used fragments.
+
+    It can be shared by several threads.
+
+    :param max_bytes: Maximum size of the stored fragments, encoded in UTF-8.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024, clock=time.time):
+        super().__init__(clock)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def load(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                return entry[:2]
+            return None
+
+    def store(self, key, entry):
+        size = len(entry[1].encode())
+        with self.lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                return
+            self.entries[key] = (*entry, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, _, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+                self.stats.evictions += 1
+
+    def delete(self, key):
+        with self.lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
+
+    def clear(self):
+        """Remove all the fragments."""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+def key_to_str(key):
+    """Convert a composed cache key to a string.
+
+    The representation of the tuple is used, so that composed keys and the
+    types of their parts are not confused (``("page", "sidebar")`` and
+    ``("page/sidebar",)``, ``1`` and ``"1"``...).
+    """
+    return repr(key)
+
+
+class MappingCache(FragmentCache):
+    """Cache storing fragments in a mapping.
+
+    The mapping only needs ``__getitem__``, ``__setitem__`` and
+    ``__delitem__``, so a client of an external store can be wrapped in a
+    small adapter. Keys are strings and values are ``(expires, fragment)``
+    tuples.
+    """
+
+    def __init__(self, mapping=None, clock=time.time):
+        super().__init__(clock)
+        self.mapping = {} if mapping is None else mapping
+
+    def load(self, key):
+        try:
+            return self.mapping[key_to_str(key)]
+        except KeyError:
+            return None
+
+    def store(self, key, entry):
+        self.mapping[key_to_str(key)] = entry
+
+    def delete(self, key):
+        try:
+            del self.mapping[key_to_str(key)]
+        except KeyError:
+            pass
+
+
+class FileCache(FragmentCache):
+    """Cache storing each fragment in a file of a directory.
+
+    It can be shared by several threads and processes.
+    """
+
+    def __init__(self, directory, clock=time.time):
+        super().__init__(clock)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        """Return the path of the file of key."""
+        digest = hashlib.sha256(key_to_str(key).encode()).hexdigest()
+        return os.path.join(self.directory, digest)
+
+    def load(self, key):
+        try:
+            with open(self.path(key), encoding="utf-8", newline="") as f:
+                expires, value = f.read().split("\n", 1)
+        except (OSError, ValueError):
+            return None
+        return (float(expires) if expires else None, value)
+
+    def store(self, key, entry):
+        expires, value = entry
+        path = self.path(key)
+        # write to a file of its own then rename, so that readers never see
+        # a partial fragment, even when several threads store the same key
+        fd, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with open(fd, "w", encoding="utf-8", newline="") as f:
+                f.write(f"{'' if expires is None else repr(expires)}\n{value}")
+            os.replace(temporary_path, path)
+        except BaseException:
+            try:
+                os.remove(temporary_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+
+default_cache = MemoryCache()
+"""Cache used by :func:`cached` when no cache is given."""
+
+_enclosing_key = ContextVar("enclosing_key", default=None)
+
+
+class Cached(Node):
+    """Node rendered once and then read from a cache (see :func:`cached`)."""
+
+    __slots__ = ("key", "thunk", "ttl", "cache")
+
+    def __init__(self, key, thunk, ttl=None, cache=None):
+        self.key = key
+        self.thunk = thunk
+        self.ttl = ttl
+        self.cache = cache
+
+    def full_key(self, compiler):
+        """Compose the key with the ones of the enclosing cached nodes."""
+        enclosing_key = _enclosing_key.get()
+        if enclosing_key is None:
+            return (compiler.mode, compiler.escape_strings, self.key)
+        return (*enclosing_key, self.key)
+
+    def expand(self, compiler):
+        cache = default_cache if self.cache is None else self.cache
+        key = self.full_key(compiler)
+        fragment = cache.get(key)
+        if fragment is None:
+            token = _enclosing_key.set(key)
+            try:
+                fragment = without_deferred_slots(compiler).compile_html(self.thunk())
+            finally:
+                _enclosing_key.reset(token)
+            cache.set(key, fragment, self.ttl)
+        return RawStr(fragment)
+
+    async def aexpand(self, compiler):
+        cache = default_cache if self.cache is None else self.cache
+        key = self.full_key(compiler)
+        fragment = cache.get(key)
+        if fragment is None:
+            token = _enclosing_key.set(key)
+            try:
+                parts = [
+                    part
+                    async for part in without_deferred_slots(compiler).aiter_html(
+                        self.thunk()
+                    )
+                ]
+            finally:
+                _enclosing_key.reset(token)
+            fragment = "".join(parts)
+            cache.set(key, fragment, self.ttl)
+        return RawStr(fragment)
+
+
+def cached(key, thunk, ttl=None, cache=None):
+    """Create a node whose rendering is cached.
+
+    When the node is compiled, the fragment stored at key is used if present.
+    Otherwise, ``thunk`` is called without arguments, the content it returns is
+    rendered and stored for ``ttl`` seconds (forever if None).
+
+    With :hy:func:`hyccup.core.async_html` and
+    :hy:func:`hyccup.core.aiter_html`, the awaitables of the content are
+    resolved before it is stored.
+
+    Keys of nested cached nodes are composed with the keys of the enclosing
+    ones, like in russian doll caching: an outer hit skips the inner nodes,
+    while after an outer miss the inner fragments can still be hits. The mode
+    and the escaping option are part of the keys.
+
+    :param key: Hashable key, converted to str by file and mapping caches
+                with its ``repr``, which must not change between processes
+                for a file cache.
+    :param thunk: Function returning the content to render.
+    :param ttl: Time to live of the fragment in seconds.
+    :param cache: A :class:`FragmentCache` (default: :data:`default_cache`).
+    """
+    return Cached(key, thunk, ttl, cache)
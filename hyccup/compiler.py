@@ -1,20 +1,28 @@
-from hyccup.util import escape_html, RawStr, is_empty, to_str
+from hyccup.util import (
+    escape_html,
+    FrozenAttrs,
+    RawStr,
+    is_coll,
+    is_empty,
+    to_html,
+    to_str,
+)
 import re
-from hyrule import is_coll
-from itertools import filterfalse
-from collections.abc import Iterator
+from fractions import Fraction
+from functools import lru_cache
+from operator import is_
+from collections.abc import AsyncIterable, Iterator
+from urllib.parse import SplitResult
 
 
-def is_xml_mode(mode):
-    return str(mode) in {"xml", "xhtml"}
-
-
-def is_html_mode(mode):
-    return str(mode) in {"html", "xhtml"}
+XML_MODES = frozenset({"xml", "xhtml"})
+"""Modes closing the void elements with ``" />"``."""
 
+HTML_MODES = frozenset({"html", "xhtml"})
+"""Modes rendering the empty non-void elements with a closing tag."""
 
-def is_void_tag(tag_name):
-    return tag_name in {
+VOID_TAGS = frozenset(
+    {
         "area",
         "base",
         "br",
@@ -32,65 +40,251 @@ def is_void_tag(tag_name):
         "track",
         "wbr",
     }
+)
+"""Tags of the elements which cannot have children."""
+
+
+def is_xml_mode(mode):
+    return str(mode) in XML_MODES
+
+
+def is_html_mode(mode):
+    return str(mode) in HTML_MODES
+
+
+def is_void_tag(tag_name):
+    return tag_name in VOID_TAGS
 
 
 def is_container_tag(tag_name, mode):
     return is_html_mode(mode) and not is_void_tag(tag_name)
 
 
+def is_static(exp):
+    """Assert that exp renders the same way each time it is compiled.
+
+    Strings, numbers and None are static. Any other object (iterator, callable,
+    arbitrary object...) is dynamic as its rendering may change between two
+    compilations.
+    """
+    return exp is None or isinstance(exp, (str, int, float, Fraction))
+
+
+def is_static_attr_value(value):
+    """Assert that an attribute value is static (see :func:`is_static`)."""
+    if isinstance(value, (list, tuple)):
+        return all(isinstance(item, str) for item in value)
+
+    return is_static(value) or isinstance(value, SplitResult)
+
+
+class Node:
+    """Base class of the special nodes which can be found in the content.
+
+    A node is not rendered itself: when a compiler meets it, it calls
+    :meth:`expand` and compiles the returned content instead.
+    """
+
+    __slots__ = ()
+
+    def expand(self, compiler):
+        """Return the content replacing the node when compiled with compiler."""
+        raise NotImplementedError
+
+    async def aexpand(self, compiler):
+        """Asynchronous version of :meth:`expand`, used by :class:`AsyncCompiler`.
+
+        By default, return the result of :meth:`expand`.
+        """
+        return self.expand(compiler)
+
+
+def merge_raw_parts(parts):
+    """Merge adjacent raw strings of parts and drop empty ones."""
+    merged = []
+    for part in parts:
+        if isinstance(part, RawStr):
+            if not part:
+                continue
+            if merged and isinstance(merged[-1], RawStr):
+                merged[-1] = merged[-1] + part
+                continue
+        merged.append(part)
+    return merged
+
+
+TAG_ABBR_RE = re.compile(r"([^\s\.#]+)(?:#([^\s\.#]+))?(?:\.([^\s#]+))?")
+
+TAG_CACHE_SIZE = 1024
+
+
+def parse_tag_abb(tag_abbr_str):
+    """Parse a tag abbreviation string (see :func:`expand_tag_abb`)."""
+    name, id_, classes = TAG_ABBR_RE.match(tag_abbr_str).group(1, 2, 3)
+    formatted_classes = (classes or "").replace(".", " ")
+    return (name, id_, formatted_classes)
+
+
+_cached_parse_tag_abb = lru_cache(maxsize=TAG_CACHE_SIZE)(parse_tag_abb)
+
+
 def expand_tag_abb(tag):
     """Expand a tag abbreviation
 
-    Take a str or symbol and return a list containing:
+    Take a str or symbol and return a tuple containing:
     - the name of the element
     - its id
     - its classes
+
+    Results are memoized in a bounded table (see :func:`set_tag_cache_size`).
     """
-    tag_abbr_str = str(tag)
-    tag_abbr_re = re.compile(r"([^\s\.#]+)(?:#([^\s\.#]+))?(?:\.([^\s#]+))?")
-    name, id_, classes = tag_abbr_re.match(tag_abbr_str).group(1, 2, 3)
-    formatted_classes = (classes or "").replace(".", " ")
-    return [name, id_, formatted_classes]
+    return _cached_parse_tag_abb(str(tag))
+
+
+def set_tag_cache_size(maxsize):
+    """Set the maximum number of memoized tag abbreviations and clear the table.
+
+    ``None`` makes the table unbounded, ``0`` disables memoization.
+    """
+    global _cached_parse_tag_abb
+    _cached_parse_tag_abb = lru_cache(maxsize=maxsize)(parse_tag_abb)
+
+
+def tag_cache_info():
+    """Return hits, misses, maximum and current sizes of the tag abbreviations table."""
+    return _cached_parse_tag_abb.cache_info()
+
+
+def normalize_element(tag, attrs):
+    """Expand the tag abbreviation and merge it into the attributes.
+
+    Return the tag name and the attributes dictionary with string keys.
+    """
+    attributes = {str(k): v for k, v in attrs.items()}
+    classes_from_attrs = attributes.get("class", "")
+    tag_name, element_id, classes_from_abbr = expand_tag_abb(tag)
+    if element_id and not "id" in attributes:
+        attributes["id"] = element_id
+
+    if classes_from_attrs:
+        attributes["class"] = merge_classes(classes_from_abbr, classes_from_attrs)
+    elif classes_from_abbr:
+        attributes["class"] = classes_from_abbr
+
+    return tag_name, attributes
+
+
+def merge_classes(classes_from_abbr, classes_from_attrs):
+    """Merge the classes of the tag abbreviation and of the attributes."""
+    if not classes_from_abbr and not is_coll(classes_from_attrs):
+        return classes_from_attrs
+
+    return " ".join(
+        filter(
+            None,
+            [
+                classes_from_abbr,
+                " ".join(classes_from_attrs)
+                if is_coll(classes_from_attrs)
+                else classes_from_attrs,
+            ],
+        )
+    )
+
+
+class Element:
+    """Element normalized once, when it is created.
+
+    It is an alternative to element lists: the tag abbreviation is expanded,
+    the attributes are merged with it and the children are checked when the
+    element is created, and its tags are formatted once per mode. Create
+    elements with :data:`hyccup.builder.h`.
+    """
+
+    __slots__ = ("tag_name", "attributes", "children", "tags")
+
+    def __init__(self, tag, *content):
+        if content and isinstance(content[0], dict):
+            attrs = content[0]
+            content = content[1:]
+        else:
+            attrs = {}
+        self.tag_name, self.attributes = normalize_element(tag, attrs)
+        if content and is_void_tag(self.tag_name):
+            raise ValueError(f"'{self.tag_name}' cannot have children")
+        self.children = content
+        # mode and tags formatted with this mode
+        self.tags = None
+
+    def __repr__(self):
+        return f"Element({self.as_list()!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Element):
+            return NotImplemented
+        return (
+            self.tag_name == other.tag_name
+            and self.attributes == other.attributes
+            and self.children == other.children
+        )
+
+    __hash__ = None
+
+    def as_list(self):
+        """Return the element list equivalent to the element."""
+        return [self.tag_name, self.attributes, *self.children]
 
 
 class Compiler:
+    """Compiler of the content to HTML for a mode and an escaping option.
+
+    The decisions depending on the mode are made once, when the compiler is
+    created. Compilers hold no rendering state, so an instance can be shared
+    by all the renderings using the same options (see :func:`shared_compiler`).
+    """
+
+    deferred_slots = None
+    """Collector of the deferred subtrees of streamed renderings."""
+
     def __init__(self, mode, escape_strings):
         self.mode = mode
         self.escape_strings = escape_strings
+        self.xml_mode = is_xml_mode(mode)
+        self.html_mode = is_html_mode(mode)
+        self.void_element_end = " />" if self.xml_mode else ">"
 
     def compile_html(self, *content):
         """Compile HTML content to string."""
-        compiled_elements = (self.compile_element_exp(el) for el in content)
-        return "".join(compiled_elements)
+        fragments = []
+        self.write_html(fragments.append, *content)
+        return "".join(fragments)
 
     def compile_element_exp(self, exp):
         """Compile any expression representing an element to a HTML string.
 
         Called by self.compile-html.
         """
-        if isinstance(exp, Iterator):
-            return "".join(self.compile_element_exp(el) for el in exp)
-        if isinstance(exp, list):
-            return self.compile_list(exp)
-        if isinstance(exp, RawStr):
-            return exp
-        if exp is None:
-            return ""
-
-        return escape_html(str(exp), self.mode, self.escape_strings)
+        fragments = []
+        self.write_element_exp(exp, fragments.append)
+        return "".join(fragments)
 
     def compile_list(self, element_list):
         """Take an element list and call render-element to render it.
 
         Called by self.compile-element-exp.
         """
+        tag, attrs, children = self.split_list(element_list)
+        return self.render_element(tag, attrs, *children)
+
+    def split_list(self, element_list):
+        """Split an element list into its tag, its attributes and its children."""
         match element_list:
             case [str(tag)]:
-                return self.render_element(tag, {})
+                return tag, {}, ()
             case [str(tag), dict(attrs), *restt]:
-                return self.render_element(tag, attrs, *restt)
+                return tag, attrs, restt
             case [str(tag), *restt]:
-                return self.render_element(tag, {}, *restt)
+                return tag, {}, restt
             case _:
                 raise ValueError(f"{element_list} is not properly formatted")
 
@@ -101,59 +295,199 @@ class Compiler:
         Take the HTML mode as keyword argument
 
         Return a string of the HTML representation of the element.
-        Call compile-element-exp for rendering its children.
         Called by compile-list.
         """
-        attributes = {str(k): v for k, v in attrs.items()}
-        classes_from_attrs = attributes.get("class", "")
-        tag_name, element_id, classes_from_abbr = expand_tag_abb(tag)
-        if element_id and not "id" in attributes:
-            attributes["id"] = element_id
-
-        if classes_from_attrs or classes_from_abbr:
-            attributes["class"] = " ".join(
-                filterfalse(
-                    is_empty,
-                    [
-                        classes_from_abbr,
-                        " ".join(classes_from_attrs)
-                        if is_coll(classes_from_attrs)
-                        else classes_from_attrs,
-                    ],
-                )
-            )
+        fragments = []
+        self.write_element(fragments.append, tag, attrs, children)
+        return "".join(fragments)
+
+    def write_html(self, write, *content):
+        """Compile HTML content and pass the string fragments to write.
+
+        Content is traversed once and fragments are written in document order,
+        without building intermediate strings for subtrees.
+        """
+        for exp in content:
+            self.write_element_exp(exp, write)
+
+    def write_element_exp(self, exp, write):
+        """Compile any expression representing an element and write it.
+
+        Called by self.write-html.
+        """
+        if isinstance(exp, list):
+            tag, attrs, children = self.split_list(exp)
+            self.write_element(write, tag, attrs, children)
+        elif isinstance(exp, Element):
+            self.write_built_element(write, exp)
+        elif isinstance(exp, RawStr):
+            write(exp)
+        elif isinstance(exp, Iterator):
+            for el in exp:
+                self.write_element_exp(el, write)
+        elif isinstance(exp, Node):
+            self.write_element_exp(exp.expand(self), write)
+        elif exp is not None:
+            write(to_html(exp, self.mode, self.escape_strings))
+
+    def write_element(self, write, tag, attrs, children):
+        """Compile an element and write it.
+
+        Called by self.write-element-exp.
+        """
+        tag_name, formatted_attrs = self.element_head(tag, attrs)
 
         if is_empty(children):
-            return f"<{tag_name}{self.format_attrs_dict(attributes)}" + (
-                f"></{tag_name}>"
-                if is_container_tag(tag_name, self.mode)
-                else " />"
-                if is_xml_mode(self.mode)
-                else ">"
+            write(f"<{tag_name}{formatted_attrs}{self.empty_element_end(tag_name)}")
+            return
+
+        if tag_name in VOID_TAGS:
+            raise ValueError(f"'{tag_name}' cannot have children")
+
+        write(f"<{tag_name}{formatted_attrs}>")
+        for child in children:
+            self.write_element_exp(child, write)
+        write(f"</{tag_name}>")
+
+    def write_built_element(self, write, element):
+        """Compile an :class:`Element` and write it.
+
+        Called by self.write-element-exp.
+        """
+        _, empty_tag, opening_tag, closing_tag = self.element_tags(element)
+        if not element.children:
+            write(empty_tag)
+            return
+
+        write(opening_tag)
+        for child in element.children:
+            self.write_element_exp(child, write)
+        write(closing_tag)
+
+    def element_tags(self, element):
+        """Return the mode and the empty, opening and closing tags of an Element.
+
+        They are computed once for each mode and stored in the element.
+        """
+        tags = element.tags
+        if tags is None or tags[0] != self.mode:
+            tag_name = element.tag_name
+            head = f"<{tag_name}{self.format_attrs_dict(element.attributes)}"
+            tags = element.tags = (
+                self.mode,
+                head + self.empty_element_end(tag_name),
+                head + ">",
+                f"</{tag_name}>",
             )
+        return tags
+
+    def empty_element_end(self, tag_name):
+        """Return the end of an element without children, after its attributes."""
+        if self.html_mode and tag_name not in VOID_TAGS:
+            return f"></{tag_name}>"
+        return self.void_element_end
 
-        if is_void_tag(tag_name):
+    def iter_html(self, *content):
+        """Compile HTML content to an iterator of string fragments.
+
+        Fragments are produced in document order, so that the beginning of
+        the document is available before its end is compiled.
+        """
+        for exp in content:
+            yield from self.iter_element_exp(exp)
+
+    def iter_element_exp(self, exp):
+        """Compile any expression representing an element to string fragments.
+
+        Called by self.iter-html.
+        """
+        if isinstance(exp, Iterator):
+            for el in exp:
+                yield from self.iter_element_exp(el)
+        elif isinstance(exp, list):
+            yield from self.iter_list(exp)
+        elif isinstance(exp, Element):
+            yield from self.iter_built_element(exp)
+        elif isinstance(exp, RawStr):
+            yield exp
+        elif isinstance(exp, Node):
+            yield from self.iter_element_exp(exp.expand(self))
+        elif exp is not None:
+            yield to_html(exp, self.mode, self.escape_strings)
+
+    def iter_list(self, element_list):
+        """Compile an element list to string fragments.
+
+        Called by self.iter-element-exp.
+        """
+        tag, attrs, children = self.split_list(element_list)
+        tag_name, formatted_attrs = self.element_head(tag, attrs)
+
+        if is_empty(children):
+            yield f"<{tag_name}{formatted_attrs}{self.empty_element_end(tag_name)}"
+            return
+
+        if tag_name in VOID_TAGS:
             raise ValueError(f"'{tag_name}' cannot have children")
 
-        compiled_children = "".join(map(self.compile_element_exp, children))
-        return (
-            f"<{tag_name}{self.format_attrs_dict(attributes)}>"
-            + f"{compiled_children}"
-            + f"</{tag_name}>"
-        )
+        yield f"<{tag_name}{formatted_attrs}>"
+        for child in children:
+            yield from self.iter_element_exp(child)
+        yield f"</{tag_name}>"
+
+    def iter_built_element(self, element):
+        """Compile an :class:`Element` to string fragments.
+
+        Called by self.iter-element-exp.
+        """
+        _, empty_tag, opening_tag, closing_tag = self.element_tags(element)
+        if not element.children:
+            yield empty_tag
+            return
+
+        yield opening_tag
+        for child in element.children:
+            yield from self.iter_element_exp(child)
+        yield closing_tag
+
+    def element_head(self, tag, attrs):
+        """Return the tag name and the formatted attributes of an element.
+
+        The formatted attributes of a :class:`hyccup.util.FrozenAttrs` are
+        computed once and stored in it.
+        """
+        if isinstance(attrs, FrozenAttrs):
+            tag_name, element_id, classes_from_abbr = expand_tag_abb(tag)
+            key = (self.mode, element_id, classes_from_abbr)
+            formatted_attrs = attrs.formatted.get(key)
+            if formatted_attrs is None:
+                _, attributes = self.normalize_element(tag, attrs)
+                formatted_attrs = self.format_attrs_dict(attributes)
+                attrs.formatted[key] = formatted_attrs
+            return tag_name, formatted_attrs
+
+        tag_name, attributes = self.normalize_element(tag, attrs)
+        return tag_name, self.format_attrs_dict(attributes)
+
+    def normalize_element(self, tag, attrs):
+        """Expand the tag abbreviation and merge it into the attributes.
+
+        See :func:`normalize_element`.
+        """
+        return normalize_element(tag, attrs)
+
+    def merge_classes(self, classes_from_abbr, classes_from_attrs):
+        """Merge the classes of the tag abbreviation and of the attributes."""
+        return merge_classes(classes_from_abbr, classes_from_attrs)
 
     def format_attr(self, attr, value):
         if value is True:
-            return (
-                f'{str(attr)}="{str(attr)}"'
-                if is_xml_mode(self.mode)
-                else f"{str(attr)}"
-            )
+            return f'{str(attr)}="{str(attr)}"' if self.xml_mode else f"{str(attr)}"
 
         if not value:
             return ""
 
-        attr_value = escape_html(to_str(value), self.mode, escape_strings=True)
+        attr_value = to_html(value, self.mode, True, to_str)
         return f'{str(attr)}="{attr_value}"'
 
     def format_attrs_dict(self, attrs_dict):
@@ -161,8 +495,328 @@ class Compiler:
         if not attrs_dict:
             return ""
 
-        formatted_attrs = (
-            self.format_attr(attr, value) for attr, value in sorted(attrs_dict.items())
+        xml_mode = self.xml_mode
+        formatted_attrs = []
+        for attr, value in sorted(attrs_dict.items()):
+            if value is True:
+                formatted_attrs.append(f' {attr}="{attr}"' if xml_mode else f" {attr}")
+            elif value:
+                attr_value = to_html(value, self.mode, True, to_str)
+                formatted_attrs.append(f' {attr}="{attr_value}"')
+        return "".join(formatted_attrs)
+
+    def precompile(self, *content):
+        """Fold the static parts of content into raw strings.
+
+        Return a list of content items rendering exactly like ``content`` with
+        this compiler: every fully static subtree is replaced by the raw string
+        of its rendering and adjacent raw strings are merged. Only the dynamic
+        parts (see :func:`is_static`) are left to compile.
+        """
+        parts = []
+        for exp in content:
+            parts.extend(self.precompile_element_exp(exp))
+        return merge_raw_parts(parts)
+
+    def precompile_element_exp(self, exp):
+        """Precompile an expression to a list of parts.
+
+        Called by self.precompile.
+        """
+        if isinstance(exp, list):
+            return self.precompile_list(exp)
+        if isinstance(exp, Element):
+            return self.precompile_list(exp.as_list())
+        if self.is_static(exp):
+            return [RawStr(self.compile_element_exp(exp))]
+
+        return [exp]
+
+    def is_static(self, exp):
+        """Assert that exp can be precompiled (see :func:`is_static`)."""
+        return is_static(exp)
+
+    def is_static_attr_value(self, value):
+        """Assert that an attribute value can be precompiled."""
+        return is_static_attr_value(value)
+
+    def may_be_attrs(self, exp):
+        """Assert that a dynamic exp may be an attributes dict once evaluated."""
+        return not (
+            isinstance(exp, (list, Element, Iterator, Node)) or self.is_static(exp)
         )
-        attrs_str = " ".join(filterfalse(is_empty, formatted_attrs))
-        return f" {attrs_str}" if attrs_str else ""
+
+    def precompile_list(self, element_list):
+        """Precompile an element list to a list of parts.
+
+        The opening and closing tags are folded if the tag and the attributes
+        are static. Otherwise the element is kept as a list whose children are
+        precompiled.
+        Called by self.precompile-element-exp.
+        """
+        match element_list:
+            case [str(tag), dict(attrs), *children] if all(
+                isinstance(k, str) and self.is_static_attr_value(v)
+                for k, v in attrs.items()
+            ):
+                pass
+            case [str(tag), dict(attrs), *children]:
+                return [[tag, attrs, *self.precompile(*children)]]
+            case [str(tag), *children] if not (
+                children and self.may_be_attrs(children[0])
+            ):
+                attrs = {}
+            case [str(tag), *children]:
+                # the first child may be an attributes dict once evaluated
+                return [[tag, *self.precompile(*children)]]
+            case _:
+                return [element_list]
+
+        children_parts = self.precompile(*children)
+        if all(isinstance(part, RawStr) for part in children_parts):
+            return [RawStr(self.render_element(tag, attrs, *children))]
+
+        tag_name, formatted_attrs = self.element_head(tag, attrs)
+        if tag_name in VOID_TAGS:
+            return [[tag, attrs, *children_parts]]
+
+        return [
+            RawStr(f"<{tag_name}{formatted_attrs}>"),
+            *children_parts,
+            RawStr(f"</{tag_name}>"),
+        ]
+
+
+class StackCompiler(Compiler):
+    """Compiler traversing the content with an explicit stack.
+
+    Its output is identical to the one of :class:`Compiler`, but as it does
+    not recurse, the depth of the content is not limited by the recursion
+    limit of Python.
+    """
+
+    def iter_html(self, *content):
+        """Compile HTML content to an iterator of string fragments.
+
+        The stack contains iterators over children lists and the closing tags
+        of the elements being compiled.
+        """
+        stack = [iter(content)]
+        while stack:
+            top = stack[-1]
+            if isinstance(top, str):
+                stack.pop()
+                yield top
+                continue
+
+            exp = next(top, _END)
+            if exp is _END:
+                stack.pop()
+            elif isinstance(exp, list):
+                tag, attrs, children = self.split_list(exp)
+                tag_name, formatted_attrs = self.element_head(tag, attrs)
+
+                if is_empty(children):
+                    yield f"<{tag_name}{formatted_attrs}{self.empty_element_end(tag_name)}"
+                    continue
+
+                if tag_name in VOID_TAGS:
+                    raise ValueError(f"'{tag_name}' cannot have children")
+
+                yield f"<{tag_name}{formatted_attrs}>"
+                stack.append(f"</{tag_name}>")
+                stack.append(iter(children))
+            elif isinstance(exp, Element):
+                _, empty_tag, opening_tag, closing_tag = self.element_tags(exp)
+                if not exp.children:
+                    yield empty_tag
+                    continue
+
+                yield opening_tag
+                stack.append(closing_tag)
+                stack.append(iter(exp.children))
+            elif isinstance(exp, RawStr):
+                yield exp
+            elif isinstance(exp, Iterator):
+                stack.append(exp)
+            elif isinstance(exp, Node):
+                stack.append(iter((exp.expand(self),)))
+            elif exp is not None:
+                yield to_html(exp, self.mode, self.escape_strings)
+
+    def iter_element_exp(self, exp):
+        return self.iter_html(exp)
+
+    def write_html(self, write, *content):
+        for fragment in self.iter_html(*content):
+            write(fragment)
+
+    def write_element_exp(self, exp, write):
+        self.write_html(write, exp)
+
+    def write_element(self, write, tag, attrs, children):
+        self.write_html(write, [tag, attrs, *children])
+
+
+_END = object()
+
+ENGINES = {"recursive": Compiler, "stack": StackCompiler}
+"""Compiler classes which can be selected with the ``engine`` option."""
+
+
+def get_compiler_class(engine):
+    """Return the compiler class of an engine name."""
+    try:
+        return ENGINES[engine]
+    except KeyError:
+        raise ValueError(
+            f"unknown engine {engine!r}, expected one of {', '.join(ENGINES)}"
+        ) from None
+
+
+@lru_cache(maxsize=None)
+def shared_compiler(compiler_class, mode, escape_strings):
+    """Return the instance of compiler_class shared for mode and escape_strings.
+
+    Compilers are created once for each set of options, and reused by the
+    renderings. They must not be modified.
+    """
+    return compiler_class(mode, escape_strings)
+
+
+class AsyncCompiler(Compiler):
+    """Compiler resolving awaitables and async iterables found in the content.
+
+    Awaitables are replaced by their result and async iterables are expanded
+    like iterators. All the awaitables of the content are scheduled before it
+    is compiled, wherever they are, so that they are resolved concurrently.
+    The awaitables found in their results or in the expansions of the nodes
+    are scheduled as soon as they are found.
+
+    asyncio and inspect are imported by the methods, so that they are only
+    loaded when asynchronous rendering is used.
+    """
+
+    async def aiter_html(self, *content):
+        """Compile HTML content to an async iterator of string fragments."""
+        tasks = []
+        try:
+            content = [self.schedule(exp, tasks) for exp in content]
+            async for fragment in self.aiter_children(content):
+                yield fragment
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def schedule(self, exp, tasks):
+        """Return exp with its awaitables replaced by scheduled tasks.
+
+        Lists, elements and attributes are searched, and the ones containing
+        awaitables are copied, so that the content given by the caller is left
+        untouched. Iterators are searched lazily, item by item as they are
+        compiled, so that they are still streamed. Nodes and async iterables
+        are searched once expanded, and the results of the tasks once
+        received. The tasks are appended to tasks.
+        """
+        import asyncio
+        import inspect
+
+        if inspect.isawaitable(exp):
+            task = asyncio.ensure_future(self.resolve(exp, tasks))
+            tasks.append(task)
+            return task
+        if isinstance(exp, list):
+            children = [self.schedule(child, tasks) for child in exp]
+            if all(map(is_, children, exp)):
+                return exp
+            return children
+        if isinstance(exp, dict):
+            values = {key: self.schedule(value, tasks) for key, value in exp.items()}
+            if all(map(is_, values.values(), exp.values())):
+                return exp
+            return values
+        if isinstance(exp, Element):
+            element_list = exp.as_list()
+            scheduled = self.schedule(element_list, tasks)
+            return exp if scheduled is element_list else scheduled
+        if isinstance(exp, Iterator):
+            return (self.schedule(child, tasks) for child in exp)
+        return exp
+
+    async def resolve(self, awaitable, tasks):
+        """Await awaitable and return its result, with its awaitables scheduled."""
+        return self.schedule(await awaitable, tasks)
+
+    async def aiter_children(self, children):
+        """Compile siblings to string fragments.
+
+        Called by self.aiter-html, self.aiter-element-exp and self.aiter-list.
+        """
+        for child in children:
+            async for fragment in self.aiter_element_exp(child):
+                yield fragment
+
+    async def aiter_element_exp(self, exp):
+        """Compile any expression representing an element to string fragments.
+
+        Called by self.aiter-children.
+        """
+        import inspect
+
+        tasks = []
+        try:
+            while inspect.isawaitable(exp) or isinstance(exp, Node):
+                if inspect.isawaitable(exp):
+                    exp = await exp
+                else:
+                    exp = self.schedule(await exp.aexpand(self), tasks)
+
+            if isinstance(exp, Iterator):
+                async for fragment in self.aiter_children(exp):
+                    yield fragment
+            elif isinstance(exp, AsyncIterable):
+                async for el in exp:
+                    el = self.schedule(el, tasks)
+                    async for fragment in self.aiter_element_exp(el):
+                        yield fragment
+            elif isinstance(exp, list):
+                async for fragment in self.aiter_list(exp):
+                    yield fragment
+            elif isinstance(exp, Element):
+                async for fragment in self.aiter_list(exp.as_list()):
+                    yield fragment
+            elif isinstance(exp, RawStr):
+                yield exp
+            elif exp is not None:
+                yield to_html(exp, self.mode, self.escape_strings)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def aiter_list(self, element_list):
+        """Compile an element list to string fragments.
+
+        Awaitable attribute values are resolved concurrently.
+        Called by self.aiter-element-exp.
+        """
+        import asyncio
+        import inspect
+
+        tag, attrs, children = self.split_list(element_list)
+        awaitable_attrs = {k: v for k, v in attrs.items() if inspect.isawaitable(v)}
+        if awaitable_attrs:
+            values = await asyncio.gather(*awaitable_attrs.values())
+            attrs = attrs | dict(zip(awaitable_attrs, values))
+        tag_name, formatted_attrs = self.element_head(tag, attrs)
+
+        if is_empty(children):
+            yield f"<{tag_name}{formatted_attrs}{self.empty_element_end(tag_name)}"
+            return
+
+        if tag_name in VOID_TAGS:
+            raise ValueError(f"'{tag_name}' cannot have children")
+
+        yield f"<{tag_name}{formatted_attrs}>"
+        async for fragment in self.aiter_children(children):
+            yield fragment
+        yield f"</{tag_name}>"
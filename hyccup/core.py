@@ -1,7 +1,25 @@
-from hyccup.compiler import Compiler, RawStr
+import io
 
+from hyccup.compiler import (
+    AsyncCompiler,
+    Compiler,
+    RawStr,
+    get_compiler_class,
+    shared_compiler,
+)
+from hyccup.deferred import AsyncDeferredSlots, DeferredSlots, with_deferred_slots
+from hyccup.tracing import new_compiler
 
-def html(*content, mode="xhtml", escape_strings=True):
+
+def html(
+    *content,
+    mode="xhtml",
+    escape_strings=True,
+    engine="recursive",
+    executor=None,
+    timeout=None,
+    on_error=None,
+):
     """Compile data structure into an HTML raw string.
 
     RawStr is a subclass of str, so it can be manipulated just like a string.
@@ -10,12 +28,227 @@ def html(*content, mode="xhtml", escape_strings=True):
     :param mode: The HTML mode: ``"html"`` / ``"xml"`` / ``"xhtml"`` (default).
     :param escape-strings: Boolean indicating if strings must be escaped
                           (default: ``True``).
+    :param engine: The traversal engine: ``"recursive"`` (default) or
+                   ``"stack"``, which uses an explicit stack instead of
+                   recursive calls and can render content of any depth.
+    :param executor: A :class:`concurrent.futures.Executor` in which the
+                     :hy:func:`lazy <hyccup.lazy.lazy>` nodes are called
+                     concurrently before the rendering. Without executor,
+                     they are called one after the other while rendering.
+    :param timeout: With an executor, maximum time in seconds to resolve the
+                    lazy nodes.
+    :param on_error: With an executor, function returning the content to
+                     render instead of a failed lazy node (see
+                     :func:`hyccup.lazy.resolve`).
     :rtype: :class:`hyccup.util.RawStr`
     """
-    compiled_content = Compiler(mode, escape_strings).compile_html(*content)
+    compiler = new_compiler(get_compiler_class(engine), mode, escape_strings)
+    if executor is not None:
+        from hyccup.lazy import resolve
+
+        content = resolve(content, executor, timeout, on_error)
+    compiled_content = compiler.compile_html(*content)
     return raw(compiled_content)
 
 
+def html_bytes(
+    *content, mode="xhtml", escape_strings=True, encoding="utf-8", engine="recursive"
+):
+    """Compile data structure into encoded HTML.
+
+    The document is encoded once, without the intermediate raw string of
+    :hy:func:`html`. Characters which cannot be represented in the encoding
+    are replaced by character references (``&#233;`` for instance).
+
+    :param \\*content: One or more lists representing HTML to render.
+    :param mode: The HTML mode: ``"html"`` / ``"xml"`` / ``"xhtml"`` (default).
+    :param escape-strings: Boolean indicating if strings must be escaped
+                          (default: ``True``).
+    :param encoding: The encoding of the output (default: ``"utf-8"``).
+    :param engine: The traversal engine (see :hy:func:`html`).
+    :rtype: bytes
+    """
+    compiler = new_compiler(get_compiler_class(engine), mode, escape_strings)
+    return compiler.compile_html(*content).encode(encoding, "xmlcharrefreplace")
+
+
+def render_to(
+    out,
+    *content,
+    mode="xhtml",
+    escape_strings=True,
+    encoding="utf-8",
+    engine="recursive",
+):
+    """Compile data structure and write the HTML fragments to out.
+
+    The content is traversed once and its fragments are written directly,
+    without building the whole document in memory.
+
+    :param out: A text stream (``io.StringIO``, text file...), a binary stream
+                (``io.BytesIO``, binary file, socket file...) or a
+                ``bytearray``. Any other object with a ``write`` method is
+                considered as a text stream.
+    :param \\*content: One or more lists representing HTML to render.
+    :param mode: The HTML mode: ``"html"`` / ``"xml"`` / ``"xhtml"`` (default).
+    :param escape-strings: Boolean indicating if strings must be escaped
+                          (default: ``True``).
+    :param encoding: Encoding used for binary streams and bytearrays
+                     (default: ``"utf-8"``). Characters which cannot be
+                     represented are replaced by character references.
+    :param engine: The traversal engine (see :hy:func:`html`).
+
+    :hy:func:`Deferred <hyccup.deferred.deferred>` subtrees are written after
+    the rest of the document.
+    """
+    if isinstance(out, bytearray):
+
+        def write(fragment):
+            out.extend(fragment.encode(encoding, "xmlcharrefreplace"))
+
+    elif isinstance(out, (io.RawIOBase, io.BufferedIOBase)):
+
+        def write(fragment):
+            out.write(fragment.encode(encoding, "xmlcharrefreplace"))
+
+    else:
+        write = out.write
+
+    slots = DeferredSlots()
+    compiler = with_deferred_slots(
+        new_compiler(get_compiler_class(engine), mode, escape_strings), slots
+    )
+    try:
+        compiler.write_html(write, *content)
+        for fragment in slots.iter_completed(compiler):
+            write(fragment)
+    finally:
+        slots.close()
+
+
+def iter_html(
+    *content, mode="xhtml", escape_strings=True, chunk_size=4096, engine="recursive"
+):
+    """Compile data structure into an iterator of HTML chunks.
+
+    Chunks are yielded in document order as soon as ``chunk_size`` characters
+    are compiled, so they can be sent before the end of the document is
+    rendered (as the body of a WSGI or ASGI response for instance).
+
+    :param \\*content: One or more lists representing HTML to render.
+    :param mode: The HTML mode: ``"html"`` / ``"xml"`` / ``"xhtml"`` (default).
+    :param escape-strings: Boolean indicating if strings must be escaped
+                          (default: ``True``).
+    :param chunk-size: Minimum number of characters of a chunk, except for the
+                       last one (default: ``4096``). With ``0``, every compiled
+                       fragment is yielded.
+    :param engine: The traversal engine (see :hy:func:`html`).
+    :rtype: iterator of str
+
+    :hy:func:`Deferred <hyccup.deferred.deferred>` subtrees are rendered after
+    the rest of the document, each one in its own chunk.
+    """
+    slots = DeferredSlots()
+    compiler = with_deferred_slots(
+        new_compiler(get_compiler_class(engine), mode, escape_strings), slots
+    )
+    return _iter_chunks(compiler, content, chunk_size)
+
+
+async def async_html(*content, mode="xhtml", escape_strings=True):
+    """Compile data structure containing awaitables into an HTML raw string.
+
+    Awaitables (coroutines, tasks, futures...) found in the content are
+    replaced by their result and async iterables are expanded like iterators.
+    All the awaitables of the content are scheduled before it is rendered, so
+    that they are resolved concurrently, wherever they are, except in
+    iterators, whose items are scheduled when they are reached.
+
+    Take the same parameters as :hy:func:`html`.
+
+    :rtype: :class:`hyccup.util.RawStr`
+    """
+    compiler = new_compiler(AsyncCompiler, mode, escape_strings)
+    fragments = [fragment async for fragment in compiler.aiter_html(*content)]
+    return raw("".join(fragments))
+
+
+async def aiter_html(*content, mode="xhtml", escape_strings=True, chunk_size=4096):
+    """Compile data structure containing awaitables into an async iterator of chunks.
+
+    Awaitables and async iterables are handled like in :hy:func:`async-html`.
+    Chunks and deferred subtrees are yielded like in :hy:func:`iter-html`.
+
+    :rtype: async iterator of str
+    """
+    buffer = []
+    buffer_size = 0
+    slots = AsyncDeferredSlots()
+    compiler = with_deferred_slots(
+        new_compiler(AsyncCompiler, mode, escape_strings), slots
+    )
+    try:
+        async for fragment in compiler.aiter_html(*content):
+            buffer.append(fragment)
+            buffer_size += len(fragment)
+            if buffer_size >= chunk_size and buffer_size:
+                yield "".join(buffer)
+                buffer = []
+                buffer_size = 0
+
+        if buffer_size:
+            yield "".join(buffer)
+        async for fragment in slots.aiter_completed(compiler):
+            yield fragment
+    finally:
+        slots.close()
+
+
+def _iter_chunks(compiler, content, chunk_size):
+    """Compile content to chunks, followed by its deferred subtrees."""
+    slots = compiler.deferred_slots
+    try:
+        yield from _chunks(compiler.iter_html(*content), chunk_size)
+        yield from slots.iter_completed(compiler)
+    finally:
+        slots.close()
+
+
+def _chunks(fragments, chunk_size):
+    """Group fragments into chunks of at least chunk_size characters."""
+    buffer = []
+    buffer_size = 0
+    for fragment in fragments:
+        buffer.append(fragment)
+        buffer_size += len(fragment)
+        if buffer_size >= chunk_size and buffer_size:
+            yield "".join(buffer)
+            buffer = []
+            buffer_size = 0
+
+    if buffer_size:
+        yield "".join(buffer)
+
+
+def precompile(*content, mode="xhtml", escape_strings=True):
+    """Fold the static parts of content into raw strings.
+
+    Every fully static subtree (made of strings, numbers and ``None``) is
+    rendered once and replaced by a raw string. The returned list must be
+    rendered with :hy:func:`html` using the same options::
+
+        >>> precompile(["ul", ["li", "static"], items_generator])
+        ['<ul><li>static</li>', <generator object ...>, '</ul>']
+
+    :param \\*content: One or more lists representing HTML to precompile.
+    :param mode: The HTML mode: ``"html"`` / ``"xml"`` / ``"xhtml"`` (default).
+    :param escape-strings: Boolean indicating if strings must be escaped
+                          (default: ``True``).
+    :rtype: list
+    """
+    return shared_compiler(Compiler, mode, escape_strings).precompile(*content)
+
+
 def raw(obj):
     """Produce a raw string from obj.
 
@@ -0,0 +1,199 @@
+"""Out-of-order streaming of slow subtrees."""
+import copy
+from contextvars import copy_context
+
+from hyccup.compiler import Node
+from hyccup.util import RawStr
+
+SLOT_PREFIX = "hyccup-deferred-"
+"""Prefix of the ids of the slots of the deferred subtrees."""
+
+SWAP_SCRIPT = RawStr(
+    "<script>function hyccupSwap(i){"
+    "var s=document.getElementById(i),t=document.getElementById(i+'-content'),"
+    "p=s.parentNode,n=s.nextSibling;"
+    "while(n){if(n.nodeType===8){if(n.data==='/'+i)break}"
+    "var x=n.nextSibling;p.removeChild(n);n=x}"
+    "if(n)p.removeChild(n);"
+    "p.replaceChild(t.content,s);t.parentNode.removeChild(t)}</script>"
+)
+"""Script defining the function which replaces a fallback by its subtree.
+
+It contains neither ``<`` nor ``&``, so that it is also well-formed XML.
+"""
+
+
+class Deferred(Node):
+    """Subtree streamed after the rest of the document (see :func:`deferred`)."""
+
+    __slots__ = ("content", "fallback")
+
+    def __init__(self, content, fallback=None):
+        self.content = content
+        self.fallback = fallback
+
+    def expand(self, compiler):
+        slots = compiler.deferred_slots
+        if slots is None:
+            return self.content() if callable(self.content) else self.content
+        slot_id = slots.add(self.content)
+        return iter(
+            (
+                RawStr(f'<template id="{slot_id}"></template>'),
+                self.fallback,
+                RawStr(f"<!--/{slot_id}-->"),
+            )
+        )
+
+
+def deferred(content, fallback=None):
+    """Stream content after the rest of the document, showing fallback meanwhile.
+
+    ``content`` is a function called without arguments, an awaitable or an
+    async function returning the content to render.
+
+    With :hy:func:`hyccup.core.iter_html`, :hy:func:`hyccup.core.aiter_html`
+    and :hy:func:`hyccup.core.render_to`, the fallback and a slot marker are
+    rendered in place and the rendering of the document goes on while the
+    content is resolved, in a thread pool for functions or concurrently for
+    awaitables. Once the document is rendered, each subtree is appended as
+    soon as it is resolved, with an inline script moving it into its slot.
+    The subtrees do not delay the rest of the page, whatever their order.
+
+    Other renderings, like :hy:func:`hyccup.core.html`, render the content in
+    place and ignore the fallback, as well as the fragments stored for later
+    renderings, like the ones of :func:`hyccup.cache.cached`. Awaitables need
+    an asynchronous rendering.
+    """
+    return Deferred(content, fallback)
+
+
+def swap_fragment(slot_id, fragment):
+    """Return the fragment moving the rendered subtree into its slot."""
+    return RawStr(
+        f'<template id="{slot_id}-content">{fragment}</template>'
+        f'<script>hyccupSwap("{slot_id}")</script>'
+    )
+
+
+def with_deferred_slots(compiler, slots):
+    """Return a copy of compiler collecting the deferred subtrees into slots."""
+    compiler = copy.copy(compiler)
+    compiler.deferred_slots = slots
+    return compiler
+
+
+def without_deferred_slots(compiler):
+    """Return compiler, or a copy of it rendering the deferred subtrees in place.
+
+    Used to render the fragments which are stored for later renderings, like
+    cached ones, as their slots would not be filled by those renderings.
+    """
+    if compiler.deferred_slots is None:
+        return compiler
+    return with_deferred_slots(compiler, None)
+
+
+class DeferredSlots:
+    """Deferred subtrees of a synchronous rendering, resolved in threads."""
+
+    def __init__(self, executor=None):
+        self.executor = executor
+        self.own_executor = False
+        self.count = 0
+        # futures of the subtrees being resolved, with their slot numbers
+        self.pending = {}
+
+    def add(self, content):
+        """Start to resolve content and return the id of its slot."""
+        self.pending[self.submit(content)] = self.count
+        self.count += 1
+        return f"{SLOT_PREFIX}{self.count - 1}"
+
+    def submit(self, content):
+        from concurrent.futures import Future, ThreadPoolExecutor
+
+        if not callable(content):
+            future = Future()
+            future.set_result(content)
+            return future
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(thread_name_prefix="hyccup-deferred")
+            self.own_executor = True
+        return self.executor.submit(copy_context().run, content)
+
+    def iter_completed(self, compiler):
+        """Render the subtrees in their order of completion.
+
+        Yield the swap script first, then a fragment for each subtree.
+        """
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        try:
+            if self.pending:
+                yield SWAP_SCRIPT
+            while self.pending:
+                done, _ = wait(self.pending, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=self.pending.get):
+                    slot_id = f"{SLOT_PREFIX}{self.pending.pop(future)}"
+                    fragment = compiler.compile_html(future.result())
+                    yield swap_fragment(slot_id, fragment)
+        finally:
+            self.close()
+
+    def close(self):
+        """Cancel the pending subtrees and shut down the owned executor."""
+        for future in self.pending:
+            future.cancel()
+        self.pending.clear()
+        if self.own_executor:
+            self.executor.shutdown(wait=False)
+
+
+class AsyncDeferredSlots(DeferredSlots):
+    """Deferred subtrees of an asynchronous rendering, resolved in tasks."""
+
+    def submit(self, content):
+        import asyncio
+
+        return asyncio.ensure_future(_resolve(content))
+
+    async def aiter_completed(self, compiler):
+        """Asynchronous version of :meth:`DeferredSlots.iter_completed`."""
+        import asyncio
+
+        try:
+            if self.pending:
+                yield SWAP_SCRIPT
+            while self.pending:
+                done, _ = await asyncio.wait(
+                    self.pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in sorted(done, key=self.pending.get):
+                    slot_id = f"{SLOT_PREFIX}{self.pending.pop(task)}"
+                    fragments = [
+                        fragment
+                        async for fragment in compiler.aiter_html(task.result())
+                    ]
+                    yield swap_fragment(slot_id, "".join(fragments))
+        finally:
+            self.close()
+
+    def close(self):
+        for task in self.pending:
+            task.cancel()
+        self.pending.clear()
+
+
+async def _resolve(content):
+    """Call content in a thread if it is a function, and await the result."""
+    import asyncio
+    import inspect
+
+    if inspect.iscoroutinefunction(content):
+        content = content()
+    elif callable(content):
+        content = await asyncio.to_thread(content)
+    while inspect.isawaitable(content):
+        content = await content
+    return content
@@ -1,36 +1,132 @@
 import functools
+import threading
+from collections import OrderedDict, namedtuple
+from collections.abc import Iterator
 from hyccup import html
+from hyccup.compiler import Element
+from hyccup.tracing import trace_state
 
 
-def defhtml(func=None, /, **html_options):
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+def _freeze(value):
+    """Return a hashable key of value, distinguishing types (1 and True...)."""
+    if isinstance(value, dict):
+        return (dict, tuple((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(map(_freeze, value)))
+    return (type(value), value)
+
+
+def _is_reusable(exp):
+    """Assert that exp can be rendered several times (contains no iterator)."""
+    if isinstance(exp, Iterator):
+        return False
+    if isinstance(exp, list):
+        return all(map(_is_reusable, exp))
+    if isinstance(exp, Element):
+        return all(map(_is_reusable, exp.children))
+    return True
+
+
+def _memoize(function, maxsize, is_reusable=_is_reusable):
+    """Memoize the results of function in a table of at most maxsize entries.
+
+    Arguments, including dicts and lists, are frozen to build the key. Calls
+    with unhashable arguments and results which cannot be reused are not
+    cached. The table can be used by several threads: it is locked while it
+    is read or updated, but not during the calls of function.
+    """
+    entries = OrderedDict()
+    hits = misses = 0
+    lock = threading.Lock()
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        nonlocal hits, misses
+        key = (_freeze(args), _freeze(tuple(kwargs.items())))
+        try:
+            with lock:
+                result = entries[key]
+                entries.move_to_end(key)
+                hits += 1
+                return result
+        except KeyError:
+            pass
+        except TypeError:
+            with lock:
+                misses += 1
+            return function(*args, **kwargs)
+
+        with lock:
+            misses += 1
+        result = function(*args, **kwargs)
+        if maxsize != 0 and is_reusable(result):
+            with lock:
+                entries[key] = result
+                if maxsize is not None and len(entries) > maxsize:
+                    entries.popitem(last=False)
+        return result
+
+    def cache_info():
+        """Return hits, misses, maximum and current sizes of the cache."""
+        return CacheInfo(hits, misses, maxsize, len(entries))
+
+    def cache_clear():
+        """Clear the cache and its statistics."""
+        nonlocal hits, misses
+        with lock:
+            entries.clear()
+            hits = misses = 0
+
+    wrapper.cache_info = cache_info
+    wrapper.cache_clear = cache_clear
+    return wrapper
+
+
+def defhtml(func=None, /, *, memoize=False, maxsize=128, **html_options):
     """Decorate a function for passing its result to ``html``.
 
     Take HTML options as keyword arguments.
+
+    With ``memoize=True``, the rendered strings are cached by arguments, in a
+    table of at most ``maxsize`` entries (unbounded if None). Only use it for
+    functions whose result only depends on their arguments. The decorated
+    function then has ``cache_info`` and ``cache_clear`` methods.
     """
 
     # if HTML option is provided, we only have one func arg
     # then we simply call it and wrap its result with html()
     if callable(func):
-
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            return html(func(*args, **kwargs))
-
-        return wrapper
+        return _html_wrapper(func, {})
 
     # else if we have HTML options, we need to define a parametrized decorator
     # we define a deco() function which will accept a callable as argument.
     # it will wrap its result with html() and give it provided HTML options.
     def deco(function):
-        @functools.wraps(function)
-        def wrapper(*args, **kwargs):
-            return html(function(*args, **kwargs), **html_options)
-
+        wrapper = _html_wrapper(function, html_options)
+        if memoize:
+            return _memoize(wrapper, maxsize, is_reusable=lambda result: True)
         return wrapper
 
     return deco
 
 
+def _html_wrapper(function, html_options):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        state = trace_state.get()
+        if state is None:
+            return html(function(*args, **kwargs), **html_options)
+        return state.call_component(
+            function.__qualname__,
+            lambda: html(function(*args, **kwargs), **html_options),
+        )
+
+    return wrapper
+
+
 def _split_args(args, kwargs, method=False):
     if not method:
         match (args, kwargs):
@@ -52,7 +148,7 @@ def _split_args(args, kwargs, method=False):
                 return (self, None, other_args, kwargs)
 
 
-def defelem(function):
+def defelem(function=None, /, *, memoize=False, maxsize=128):
     """Decorate a function for defining elements.
 
     The returned object is a callable with two signature:
@@ -60,23 +156,51 @@ def defelem(function):
     * The original signature of the function
     * The original signature with as first parameter a dict of attributes. This
       will be merged with attributes of the returned element.
+
+    With ``memoize=True``, the returned elements are cached by arguments
+    (attributes dict included) like with :func:`defhtml`. Cached elements are
+    shared between calls and must not be modified. Elements containing
+    iterators are not cached.
     """
+    if function is None:
+        return functools.partial(defelem, memoize=memoize, maxsize=maxsize)
 
     @functools.wraps(function)
     def wrapper(*args, **kwargs):
         attrs_map, args, kwargs = _split_args(args, kwargs)
         raw_result = function(*args, **kwargs)
-        if attrs_map:
-            tag, *body = raw_result
+        return _merge_attrs(raw_result, attrs_map)
+
+    if memoize:
+        return _traced_element(function, _memoize(wrapper, maxsize))
+    return _traced_element(function, wrapper)
+
 
-            if body and isinstance(body[0], dict):
-                attrs_from_result, *rest = body
-                return [tag, attrs_from_result | attrs_map, *rest]
-            else:
-                return [tag, attrs_map, *body]
+def _merge_attrs(raw_result, attrs_map):
+    """Merge attrs_map into the attributes of the element raw_result."""
+    if attrs_map:
+        tag, *body = raw_result
 
+        if body and isinstance(body[0], dict):
+            attrs_from_result, *rest = body
+            return [tag, attrs_from_result | attrs_map, *rest]
         else:
-            return raw_result
+            return [tag, attrs_map, *body]
+
+    else:
+        return raw_result
+
+
+def _traced_element(function, element_function):
+    """Record the results of element_function, even cached, when tracing."""
+
+    @functools.wraps(element_function)
+    def wrapper(*args, **kwargs):
+        result = element_function(*args, **kwargs)
+        state = trace_state.get()
+        if state is not None:
+            state.add_component(function.__qualname__, result)
+        return result
 
     return wrapper
 
@@ -88,17 +212,11 @@ def _defelemmethod(method):
     def wrapper(*args, **kwargs):
         self, attrs_map, args, kwargs = _split_args(args, kwargs, method=True)
         raw_result = method(self, *args, **kwargs)
-        if attrs_map:
-            tag, *body = raw_result
-
-            if body and isinstance(body[0], dict):
-                attrs_from_result, *rest = body
-                return [tag, attrs_from_result | attrs_map, *rest]
-            else:
-                return [tag, attrs_map, *body]
-
-        else:
-            return raw_result
+        result = _merge_attrs(raw_result, attrs_map)
+        state = trace_state.get()
+        if state is not None:
+            state.add_component(method.__qualname__, result)
+        return result
 
     return wrapper
 
@@ -2,6 +2,7 @@
 from contextlib import contextmanager
 
 import hyccup.util as util
+from hyccup.compiler import Node
 from hyccup.definition import defelem
 
 
@@ -124,6 +125,8 @@ class FieldGroup:
         :param coll: Collection of options. Items should be (text, val)
         :param selected: Selected item (an available value) (default: None)
         """
+        if isinstance(coll, OptionList):
+            return SelectedOptions(coll, selected)
 
         def option_child(opt):
             match opt:
@@ -191,6 +194,273 @@ class FieldGroup:
         """
         return ["label", {"for": self.make_id(name)}, text]
 
+    def fields_grid(self, rows, columns, kind="text", values=None, attrs_map=None):
+        """Create the input fields of a grid, one for each row and column.
+
+        The field of a row and a column renders like the one created in the
+        group of the row, ``text_field`` here::
+
+            >>> with group.group(row) as row_group:
+            ...     row_group.text_field(attrs_map, column, values[row, column])
+
+        but names and ids are computed from prefixes prepared once for each
+        row and column, and the fields are rendered from templates prepared
+        once for each mode.
+
+        :param rows: The names of the rows
+        :param columns: The names of the columns
+        :param kind: ``"text"`` (default), ``"hidden"``, ``"password"``,
+                     ``"email"`` or ``"checkbox"``
+        :param values: Mapping of ``(row, column)`` pairs to the values of the
+                       fields, or to the checked state of the check boxes
+                       (default: None for all fields)
+        :param attrs_map: Attributes added to all the fields
+        :return: A list of rows, each one being a list of fields
+        """
+        grid = FieldsGrid(self.group_names, rows, columns, kind, attrs_map)
+        values = {} if values is None else values
+        return [
+            [
+                GridField(grid, row_index, column_index, values.get((row, column)))
+                for column_index, column in enumerate(grid.columns)
+            ]
+            for row_index, row in enumerate(grid.rows)
+        ]
+
+
+class OptionList:
+    """Collection of options rendered once per mode.
+
+    It can be passed to :hy:func:`select-options` and :hy:func:`drop-down`
+    instead of the collection, for large selects used many times: the options
+    are rendered the first time they are used with a mode and only the
+    selected ones are changed afterwards.
+
+    :param coll: Collection of options, like for :hy:func:`select-options`
+    """
+
+    def __init__(self, coll):
+        self.coll = tuple(coll)
+        self.renderings = {}
+
+    def render(self, compiler, selected):
+        """Render the options with compiler, selected being the selected value."""
+        key = (compiler.mode, compiler.escape_strings)
+        rendering = self.renderings.get(key)
+        if rendering is None:
+            rendering = self.renderings[key] = self.prerender(compiler)
+        text, positions, unhashable_positions = rendering
+
+        try:
+            selected_positions = positions.get(selected, [])
+        except TypeError:
+            selected_positions = []
+        if unhashable_positions:
+            selected_positions = sorted(
+                [
+                    *selected_positions,
+                    *(pos for value, pos in unhashable_positions if value == selected),
+                ],
+                key=lambda position: position[0],
+            )
+
+        if not selected_positions:
+            return text
+
+        chunks = []
+        end = 0
+        for start, option_end, option in selected_positions:
+            chunks.extend([text[end:start], option])
+            end = option_end
+        chunks.append(text[end:])
+        return "".join(chunks)
+
+    def prerender(self, compiler):
+        """Render the options, none being selected.
+
+        Return the rendering, the start and end offsets of the options with
+        their selected rendering by value, and the same for unhashable values.
+        """
+        fragments = []
+        size = 0
+        positions = {}
+        unhashable_positions = []
+
+        def write(fragment):
+            nonlocal size
+            fragments.append(fragment)
+            size += len(fragment)
+
+        def add_option(value, attrs, label):
+            option = compiler.compile_element_exp(
+                ["option", attrs | {"selected": False}, label]
+            )
+            selected_option = compiler.compile_element_exp(
+                ["option", attrs | {"selected": True}, label]
+            )
+            position = (size, size + len(option), selected_option)
+            try:
+                positions.setdefault(value, []).append(position)
+            except TypeError:
+                unhashable_positions.append((value, position))
+            write(option)
+
+        def add_options(coll):
+            for opt in coll:
+                match opt:
+                    case [label, [*sub_opts]]:
+                        tag_name, formatted_attrs = compiler.element_head(
+                            "optgroup", {"label": label}
+                        )
+                        write(f"<{tag_name}{formatted_attrs}>")
+                        add_options(sub_opts)
+                        write(f"</{tag_name}>")
+                    case [label, value]:
+                        add_option(value, {"value": value}, label)
+                    case label:
+                        add_option(label, {}, label)
+
+        add_options(self.coll)
+        return "".join(fragments), positions, unhashable_positions
+
+
+class SelectedOptions(Node):
+    """Options of an :class:`OptionList` with a selected value."""
+
+    __slots__ = ("options", "selected")
+
+    def __init__(self, options, selected):
+        self.options = options
+        self.selected = selected
+
+    def expand(self, compiler):
+        return util.RawStr(self.options.render(compiler, self.selected))
+
+
+class FieldsGrid:
+    """Rows and columns of the fields created by :meth:`FieldGroup.fields_grid`.
+
+    The fields of the grid are rendered from templates prepared once per mode.
+    """
+
+    KINDS = ("text", "hidden", "password", "email", "checkbox")
+
+    def __init__(self, group_names, rows, columns, kind="text", attrs_map=None):
+        if kind not in self.KINDS:
+            raise ValueError(f"unknown kind {kind!r}, expected one of {self.KINDS}")
+        self.group_names = group_names
+        self.rows = tuple(rows)
+        self.columns = tuple(columns)
+        self.kind = kind
+        self.attrs_map = {} if attrs_map is None else attrs_map
+        self.renderings = {}
+
+    def as_list(self, row_index, column_index, value):
+        """Return the element list of a field, as created by the field functions."""
+        row_group = FieldGroup(*self.group_names, self.rows[row_index])
+        column = self.columns[column_index]
+        if self.kind == "checkbox":
+            return row_group.check_box(self.attrs_map, column, value)
+        field = getattr(row_group, f"{self.kind}_field")
+        return field(self.attrs_map, column, value)
+
+    def render(self, compiler, row_index, column_index, value):
+        """Render the field of a row and a column with compiler."""
+        rendering = self.renderings.get(compiler.mode)
+        if rendering is None:
+            rendering = self.renderings[compiler.mode] = self.prerender(compiler)
+        templates, row_ids, row_names, checked = rendering
+
+        if self.kind == "checkbox":
+            dynamic_attr = (
+                checked
+                if value is True
+                else compiler.format_attrs_dict({"checked": value})
+            )
+        elif type(value) is str:
+            dynamic_attr = (
+                f' value="{util.escape_html(value, compiler.mode, True)}"'
+                if value
+                else ""
+            )
+        elif value is None:
+            dynamic_attr = ""
+        else:
+            dynamic_attr = compiler.format_attrs_dict({"value": value})
+        return templates[column_index].format(
+            row_ids[row_index], row_names[row_index], dynamic_attr
+        )
+
+    def prerender(self, compiler):
+        """Prepare the templates of the columns and the prefixes of the rows.
+
+        Templates are the rendered fields of the columns, formatted with the
+        escaped id and name prefixes of a row and the dynamic attribute
+        (``value``, or ``checked`` for check boxes).
+        """
+        dynamic_key = "checked" if self.kind == "checkbox" else "value"
+        templates = []
+        for column in self.columns:
+            attributes = {
+                "type": self.kind,
+                "name": f"{_ROW_NAME}[{column}]",
+                "id": f"{_ROW_ID}-{column}",
+                dynamic_key: _DYNAMIC_VALUE,
+            }
+            if self.kind == "checkbox":
+                attributes["value"] = "true"
+            tag_name, formatted_attrs = compiler.element_head(
+                "input", attributes | self.attrs_map
+            )
+            template = (
+                f"<{tag_name}{formatted_attrs}{compiler.empty_element_end(tag_name)}"
+            )
+            templates.append(
+                template.replace("{", "{{")
+                .replace("}", "}}")
+                .replace(_ROW_ID, "{0}")
+                .replace(_ROW_NAME, "{1}")
+                .replace(f' {dynamic_key}="{_DYNAMIC_VALUE}"', "{2}")
+            )
+
+        row_ids = []
+        row_names = []
+        for row in self.rows:
+            first, *rest = *self.group_names, row
+            row_id = "".join([first, *(f"-{part}" for part in rest)])
+            row_name = "".join([first, *(f"[{part}]" for part in rest)])
+            row_ids.append(util.escape_html(row_id, compiler.mode, True))
+            row_names.append(util.escape_html(row_name, compiler.mode, True))
+
+        checked = compiler.format_attrs_dict({"checked": True})
+        return templates, row_ids, row_names, checked
+
+
+_ROW_ID = "\x00row-id\x00"
+_ROW_NAME = "\x00row-name\x00"
+_DYNAMIC_VALUE = "\x00value\x00"
+
+
+class GridField(Node):
+    """Field of a :class:`FieldsGrid`."""
+
+    __slots__ = ("grid", "row_index", "column_index", "value")
+
+    def __init__(self, grid, row_index, column_index, value):
+        self.grid = grid
+        self.row_index = row_index
+        self.column_index = column_index
+        self.value = value
+
+    def as_list(self):
+        """Return the element list of the field, as created by the field functions."""
+        return self.grid.as_list(self.row_index, self.column_index, self.value)
+
+    def expand(self, compiler):
+        return util.RawStr(
+            self.grid.render(compiler, self.row_index, self.column_index, self.value)
+        )
+
 
 @contextmanager
 def group(group_name):
@@ -201,6 +471,14 @@ def group(group_name):
 _top_group = FieldGroup()
 
 
+def fields_grid(rows, columns, kind="text", values=None, attrs_map=None):
+    """Create the input fields of a grid, one for each row and column.
+
+    See :meth:`FieldGroup.fields_grid`.
+    """
+    return _top_group.fields_grid(rows, columns, kind, values, attrs_map)
+
+
 @defelem
 def hidden_field(name, value=None):
     """Create a hidden input field.
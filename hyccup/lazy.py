@@ -0,0 +1,135 @@
+"""Subtrees produced by functions, resolved concurrently in an executor."""
+import time
+from collections.abc import Iterator
+from contextvars import copy_context
+from operator import is_
+
+from hyccup.compiler import Element, Node
+
+
+class Lazy(Node):
+    """Subtree produced by a function call (see :func:`lazy`)."""
+
+    __slots__ = ("function", "args", "kwargs")
+
+    def __init__(self, function, args=(), kwargs=None):
+        self.function = function
+        self.args = args
+        self.kwargs = {} if kwargs is None else kwargs
+
+    def __repr__(self):
+        name = getattr(self.function, "__qualname__", None) or repr(self.function)
+        return f"lazy({name}, *{self.args!r}, **{self.kwargs!r})"
+
+    def call(self):
+        """Call the function and return the subtree."""
+        return self.function(*self.args, **self.kwargs)
+
+    def expand(self, compiler):
+        return self.call()
+
+
+def lazy(function, *args, **kwargs):
+    """Create a node rendering the result of ``function(*args, **kwargs)``.
+
+    The function is called when the node is compiled. With the ``executor``
+    parameter of :hy:func:`hyccup.core.html`, the lazy nodes are called
+    concurrently instead (see :func:`resolve`).
+    """
+    return Lazy(function, args, kwargs)
+
+
+class _Resolved(Node):
+    """Place of a lazy node in a prepared tree, filled once it is resolved."""
+
+    __slots__ = ("node", "content")
+
+    def __init__(self, node):
+        self.node = node
+        self.content = None
+
+    def expand(self, compiler):
+        return self.content
+
+
+def prepare(exp, slots):
+    """Return exp with its lazy nodes replaced by slots, appended to slots.
+
+    Iterators are materialized and the lists and elements containing them or
+    lazy nodes are copied, so that the content given by the caller is left
+    untouched. Other subtrees are returned as is.
+    """
+    if isinstance(exp, Lazy):
+        slot = _Resolved(exp)
+        slots.append(slot)
+        return slot
+    if isinstance(exp, list):
+        children = [prepare(child, slots) for child in exp]
+        if all(map(is_, children, exp)):
+            return exp
+        return children
+    if isinstance(exp, Element):
+        children = [prepare(child, slots) for child in exp.children]
+        if all(map(is_, children, exp.children)):
+            return exp
+        element = Element(exp.tag_name, exp.attributes, *children)
+        element.tags = exp.tags
+        return element
+    if isinstance(exp, Iterator):
+        return iter([prepare(child, slots) for child in exp])
+    return exp
+
+
+def resolve(content, executor, timeout=None, on_error=None):
+    """Call the lazy nodes of content in executor, level by level.
+
+    All the lazy nodes of a level are submitted at once, then their results
+    are searched for the lazy nodes of the next level, and so on. Return
+    the content with the lazy nodes replaced by their results, in place, so
+    that the output does not depend on the order of completion.
+
+    :param content: Tuple of the content to render.
+    :param executor: A :class:`concurrent.futures.Executor`.
+    :param timeout: Maximum time in seconds to resolve all the lazy nodes,
+                    after which the pending ones fail with
+                    :class:`TimeoutError` (default: no limit).
+    :param on_error: Function called with the exception and the
+                     :class:`Lazy` node when a lazy node fails, returning the
+                     content to render instead. By default, the first error
+                     in document order is raised and the pending nodes are
+                     cancelled.
+    :rtype: tuple
+    """
+    from concurrent.futures import wait
+
+    slots = []
+    content = tuple(prepare(exp, slots) for exp in content)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while slots:
+        futures = [
+            executor.submit(copy_context().run, slot.node.call) for slot in slots
+        ]
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        wait(futures, timeout=remaining)
+
+        next_slots = []
+        try:
+            for slot, future in zip(slots, futures):
+                if not future.done():
+                    future.cancel()
+                    error = TimeoutError(f"{slot.node!r} timed out")
+                else:
+                    error = future.exception()
+                if error is None:
+                    result = future.result()
+                elif on_error is None:
+                    raise error
+                else:
+                    result = on_error(error, slot.node)
+                slot.content = prepare(result, next_slots)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        slots = next_slots
+    return content
@@ -1,4 +1,5 @@
 from hyccup import html, raw
+from hyccup.core import html_bytes
 import hyccup.util as util
 from hyccup.definition import defelem
 
@@ -6,22 +7,29 @@ from hyccup.definition import defelem
 __all__ = ["xhtml", "html4", "html5", "include_css", "include_js"]
 
 
-def html4(*contents):
+def html4(*contents, as_bytes=False):
     """Create a HTML 4 document with the supplied contents.
 
     The first argument may be an optional attribute map.
+
+    :param as_bytes: If True, return the document encoded in UTF-8.
     """
-    return html(doctype["html4"], ["html", *contents], mode="sgml")
+    return _render(
+        as_bytes, "UTF-8", doctype["html4"], ["html", *contents], mode="sgml"
+    )
 
 
-def xhtml(*contents, lang=None, encoding="UTF-8"):
+def xhtml(*contents, lang=None, encoding="UTF-8", as_bytes=False):
     """Create a XHTML 1.0 strict document with the supplied contents.
 
     :param lang: The language of the document
     :param encoding: The character encoding of the document (defaults to UTF-8).
+    :param as_bytes: If True, return the document encoded in ``encoding``.
     """
     [attrs, contents] = split_attrs_and_content(contents)
-    return html(
+    return _render(
+        as_bytes,
+        encoding,
         xml_declaration(encoding),
         doctype["xhtml-strict"],
         xhtml_tag(attrs, lang, *contents),
@@ -29,23 +37,28 @@ def xhtml(*contents, lang=None, encoding="UTF-8"):
     )
 
 
-def html5(*contents, lang=None, xml=False, encoding="UTF-8"):
+def html5(*contents, lang=None, xml=False, encoding="UTF-8", as_bytes=False):
     """Create a HTML5 document with the supplied contents.
 
     :param xml: If True, use html with xml mode.
     :param encoding: The character encoding of the document (defaults to UTF-8).
     :param lang: The language of the document.
+    :param as_bytes: If True, return the document encoded in ``encoding``.
     """
     [attrs, contents] = split_attrs_and_content(contents)
     return (
-        html(
+        _render(
+            as_bytes,
+            encoding,
             xml_declaration(encoding),
             doctype["html5"],
             xhtml_tag(attrs, lang, *contents),
             mode="xml",
         )
         if xml
-        else html(
+        else _render(
+            as_bytes,
+            encoding,
             doctype["html5"],
             ["html", attrs | {"lang": lang}, *contents],
             mode="html",
@@ -53,6 +66,13 @@ def html5(*contents, lang=None, xml=False, encoding="UTF-8"):
     )
 
 
+def _render(as_bytes, encoding, *content, mode):
+    """Render a document to a raw string, or to bytes if as_bytes is True."""
+    if as_bytes:
+        return html_bytes(*content, mode=mode, encoding=encoding)
+    return html(*content, mode=mode)
+
+
 def include_js(*scripts):
     """Include a list of external javascript files."""
     return [
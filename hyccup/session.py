@@ -0,0 +1,222 @@
+"""Incremental renderings reusing the unchanged keyed subtrees."""
+from collections.abc import Iterator
+from contextvars import ContextVar
+from fractions import Fraction
+
+from hyccup.compiler import Element, Node, get_compiler_class
+from hyccup.deferred import without_deferred_slots
+from hyccup.tracing import new_compiler
+from hyccup.util import RawStr
+
+_VOLATILE = object()
+"""Fingerprint of content which cannot be compared with a previous one."""
+
+_LITERAL_TYPES = (str, int, float, Fraction, type(None))
+
+
+def freeze_attr_value(value):
+    """Return the fingerprint of an attribute value.
+
+    Values implementing the ``__html__`` protocol are rendered with it, so
+    its result is their fingerprint.
+    """
+    html_method = getattr(value, "__html__", None)
+    if html_method is not None:
+        return (type(value), bool(value), "__html__", html_method())
+    if isinstance(value, _LITERAL_TYPES):
+        return (type(value), value)
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(map(freeze_attr_value, value)))
+    return (type(value), bool(value), str(value))
+
+
+def snapshot(exp):
+    """Return the fingerprint of exp and exp, its iterators being materialized.
+
+    Fingerprints are nested tuples which are equal if the content renders the
+    same way. Content containing nodes, other than keyed subtrees, gets a
+    volatile fingerprint: it is rendered each time.
+    """
+    if isinstance(exp, list):
+        fingerprints = []
+        children = []
+        for child in exp:
+            if isinstance(child, dict):
+                fingerprint = (
+                    dict,
+                    tuple((str(k), freeze_attr_value(v)) for k, v in child.items()),
+                )
+            else:
+                fingerprint, child = snapshot(child)
+            fingerprints.append(fingerprint)
+            children.append(child)
+        if _VOLATILE in fingerprints:
+            return _VOLATILE, children
+        return (list, tuple(fingerprints)), children
+    if isinstance(exp, Element):
+        return snapshot(exp.as_list())
+    if isinstance(exp, Iterator):
+        fingerprint, items = snapshot(list(exp))
+        if fingerprint is not _VOLATILE:
+            fingerprint = (Iterator, fingerprint)
+        return fingerprint, iter(items)
+    if isinstance(exp, RawStr):
+        return (RawStr, str(exp)), exp
+    html_method = getattr(exp, "__html__", None)
+    if html_method is not None:
+        return (type(exp), "__html__", html_method()), exp
+    if isinstance(exp, _LITERAL_TYPES):
+        return (type(exp), exp), exp
+    if isinstance(exp, Keyed):
+        fingerprint, content = snapshot(exp.content)
+        if fingerprint is not _VOLATILE:
+            fingerprint = (Keyed, exp.key, fingerprint)
+        return fingerprint, Keyed(exp.key, content)
+    if isinstance(exp, Node):
+        return _VOLATILE, exp
+    return (type(exp), str(exp)), exp
+
+
+class _Fragment:
+    """Rendering of a keyed subtree."""
+
+    __slots__ = ("fingerprint", "output", "nested_keys")
+
+    def __init__(self, fingerprint, output, nested_keys):
+        self.fingerprint = fingerprint
+        self.output = output
+        self.nested_keys = nested_keys
+
+
+_session = ContextVar("render_session", default=None)
+
+
+class RenderSession:
+    """Successive renderings of a page reusing its unchanged keyed subtrees.
+
+    Subtrees wrapped with :func:`keyed` are compared with the ones of the
+    previous rendering of the session. The output of unchanged ones is
+    reused, and the keys of the subtrees whose output changed are reported::
+
+        >>> session = RenderSession(mode="html")
+        >>> page = session.render(layout(state))
+        >>> state.cart.add(item)
+        >>> page = session.render(layout(state))
+        >>> {key: session.fragment(key) for key in session.changed}
+        {'cart': '<div id="cart">...</div>'}
+
+    The output is the same as the one of :func:`hyccup.core.html`.
+
+    :param mode: The HTML mode: ``"html"`` / ``"xml"`` / ``"xhtml"`` (default).
+    :param escape-strings: Boolean indicating if strings must be escaped
+                          (default: ``True``).
+    :param engine: The traversal engine (see :func:`hyccup.core.html`).
+    """
+
+    def __init__(self, mode="xhtml", escape_strings=True, engine="recursive"):
+        self.mode = mode
+        self.escape_strings = escape_strings
+        self.compiler_class = get_compiler_class(engine)
+        self.fragments = {}
+        self.changed = []
+        self.removed = []
+
+    def render(self, *content):
+        """Render content, reusing the outputs of unchanged keyed subtrees.
+
+        After the rendering, :attr:`changed` contains the keys of the subtrees
+        which are new or whose output changed, and :attr:`removed` the keys of
+        the subtrees which are not in the content anymore, in document order.
+
+        :rtype: :class:`hyccup.util.RawStr`
+        """
+        previous_fragments = self.fragments
+        self.previous_fragments = previous_fragments
+        self.fragments = {}
+        self.changed_keys = set()
+        self.nested_keys = [[]]
+        compiler = new_compiler(self.compiler_class, self.mode, self.escape_strings)
+        token = _session.set(self)
+        try:
+            output = compiler.compile_html(*content)
+        except BaseException:
+            self.fragments = previous_fragments
+            raise
+        finally:
+            _session.reset(token)
+            del self.previous_fragments
+
+        self.changed = [key for key in self.fragments if key in self.changed_keys]
+        self.removed = [key for key in previous_fragments if key not in self.fragments]
+        return RawStr(output)
+
+    def fragment(self, key):
+        """Return the output of the subtree key in the last rendering.
+
+        :rtype: :class:`hyccup.util.RawStr`
+        """
+        return RawStr(self.fragments[key].output)
+
+    def render_keyed(self, key, content, compiler):
+        """Render a keyed subtree or reuse its previous output."""
+        if key in self.fragments:
+            raise ValueError(f"duplicate key {key!r}")
+
+        fingerprint, content = snapshot(content)
+        previous = self.previous_fragments.get(key)
+        if (
+            previous is not None
+            and fingerprint is not _VOLATILE
+            and previous.fingerprint == fingerprint
+        ):
+            self.reuse(key, previous)
+            return RawStr(previous.output)
+
+        # reserve the place of the fragment, so that fragments are in document order
+        self.fragments[key] = None
+        self.nested_keys[-1].append(key)
+        self.nested_keys.append([])
+        try:
+            output = without_deferred_slots(compiler).compile_element_exp(content)
+        finally:
+            nested_keys = self.nested_keys.pop()
+        self.fragments[key] = _Fragment(fingerprint, output, nested_keys)
+        if previous is None or previous.output != output:
+            self.changed_keys.add(key)
+        return RawStr(output)
+
+    def reuse(self, key, fragment):
+        """Keep the fragment of key and the ones of its nested subtrees."""
+        self.nested_keys[-1].append(key)
+        self.keep(key, fragment)
+
+    def keep(self, key, fragment):
+        if key in self.fragments:
+            raise ValueError(f"duplicate key {key!r}")
+        self.fragments[key] = fragment
+        for nested_key in fragment.nested_keys:
+            self.keep(nested_key, self.previous_fragments[nested_key])
+
+
+class Keyed(Node):
+    """Subtree identified by a key in a :class:`RenderSession`."""
+
+    __slots__ = ("key", "content")
+
+    def __init__(self, key, content):
+        self.key = key
+        self.content = content
+
+    def expand(self, compiler):
+        session = _session.get()
+        if session is None:
+            return self.content
+        return session.render_keyed(self.key, self.content, compiler)
+
+
+def keyed(key, content):
+    """Identify content by key, so that a :class:`RenderSession` can reuse it.
+
+    Outside of a session, the content is rendered as is.
+    """
+    return Keyed(key, content)
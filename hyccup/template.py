@@ -0,0 +1,168 @@
+"""Reusable templates rendering only their slots."""
+from collections.abc import Iterator
+
+from hyccup.compiler import Compiler, Node, is_void_tag, merge_raw_parts
+from hyccup.util import RawStr
+
+
+_REQUIRED = object()
+
+
+class Slot:
+    """Placeholder of a template, filled with a value when it is rendered.
+
+    Use :func:`slot` to create slots.
+    """
+
+    __slots__ = ("name", "default")
+
+    def __init__(self, name, default=_REQUIRED):
+        self.name = name
+        self.default = default
+
+    def __repr__(self):
+        return f"slot({self.name!r})"
+
+    def value(self, values):
+        """Get the value of the slot from the values passed to ``render``."""
+        value = values.get(self.name, self.default)
+        if value is _REQUIRED:
+            raise TypeError(f"missing value for slot '{self.name}'")
+        return value
+
+    def render(self, compiler, values):
+        """Render the value as content."""
+        return compiler.compile_element_exp(self.value(values))
+
+
+def slot(name, default=_REQUIRED):
+    """Create a placeholder named ``name`` for a :class:`Template`.
+
+    A slot can be used as content or as an attribute value. If no default value
+    is provided, a value must be passed when the template is rendered.
+    """
+    return Slot(name, default)
+
+
+class AttrSlot:
+    """Slot used as an attribute value."""
+
+    __slots__ = ("attr", "slot", "classes")
+
+    def __init__(self, attr, slot, classes=""):
+        self.attr = attr
+        self.slot = slot
+        self.classes = classes
+
+    def render(self, compiler, values):
+        """Render the attribute with the value (with a leading space)."""
+        value = self.slot.value(values)
+        if self.classes:
+            value = compiler.merge_classes(self.classes, value)
+        formatted_attr = compiler.format_attr(self.attr, value)
+        return f" {formatted_attr}" if formatted_attr else ""
+
+
+class TemplateCompiler(Compiler):
+    """Compiler precompiling everything but slots."""
+
+    def precompile_element_exp(self, exp):
+        # iterators are expanded once, as the template is rendered several times
+        if isinstance(exp, Iterator):
+            return self.precompile(*exp)
+
+        return super().precompile_element_exp(exp)
+
+    def is_static(self, exp):
+        # nodes are expanded each time the template is rendered
+        return not isinstance(exp, (Slot, Node))
+
+    def is_static_attr_value(self, value):
+        return not isinstance(value, Slot)
+
+    def may_be_attrs(self, exp):
+        return False
+
+    def precompile_list(self, element_list):
+        """Precompile an element list whose attribute values may be slots."""
+        tag, attrs, children = self.split_list(element_list)
+        attrs_slots = {str(k): v for k, v in attrs.items() if isinstance(v, Slot)}
+        if not attrs_slots:
+            return super().precompile_list(element_list)
+
+        static_attrs = {k: v for k, v in attrs.items() if not isinstance(v, Slot)}
+        tag_name, attributes = self.normalize_element(tag, static_attrs)
+        for attr, attr_slot in attrs_slots.items():
+            if attr == "class":
+                attributes[attr] = AttrSlot(attr, attr_slot, attributes.get(attr, ""))
+            else:
+                attributes[attr] = AttrSlot(attr, attr_slot)
+
+        parts = [RawStr(f"<{tag_name}")]
+        for attr, value in sorted(attributes.items()):
+            if isinstance(value, AttrSlot):
+                parts.append(value)
+            else:
+                parts.append(RawStr(self.format_attrs_dict({attr: value})))
+
+        if not children:
+            parts.append(RawStr(self.empty_element_end(tag_name)))
+        elif is_void_tag(tag_name):
+            raise ValueError(f"'{tag_name}' cannot have children")
+        else:
+            parts.extend(
+                [RawStr(">"), *self.precompile(*children), RawStr(f"</{tag_name}>")]
+            )
+        return merge_raw_parts(parts)
+
+
+class Template:
+    """Content precompiled once and rendered with values for its slots.
+
+    All the static parts of the content are rendered when the template is
+    created. Rendering the template only compiles the values of the slots::
+
+        >>> page = Template(["html", ["head", ["title", slot("title")]],
+        ...                          ["body", ["a", {"href": slot("url")}, "Home"]]])
+        >>> page.render(title="Hello", url="/")
+        '<html><head><title>Hello</title></head><body><a href="/">Home</a></body></html>'
+
+    :param \\*content: One or more lists representing HTML, containing slots.
+    :param mode: The HTML mode: ``"html"`` / ``"xml"`` / ``"xhtml"`` (default).
+    :param escape-strings: Boolean indicating if strings must be escaped
+                          (default: ``True``).
+    """
+
+    def __init__(self, *content, mode="xhtml", escape_strings=True):
+        self.compiler = TemplateCompiler(mode, escape_strings)
+        self.segments = [
+            str(part) if isinstance(part, RawStr) else part
+            for part in self.compiler.precompile(*content)
+        ]
+        self.dynamic_segments = [
+            (index, segment)
+            for index, segment in enumerate(self.segments)
+            if not isinstance(segment, str)
+        ]
+
+    @property
+    def slot_names(self):
+        """Names of the slots of the template."""
+        return {
+            segment.slot.name if isinstance(segment, AttrSlot) else segment.name
+            for _, segment in self.dynamic_segments
+            if isinstance(segment, (Slot, AttrSlot))
+        }
+
+    def render(self, **values):
+        """Render the template with the values of its slots.
+
+        :rtype: :class:`hyccup.util.RawStr`
+        """
+        segments = self.segments.copy()
+        for index, segment in self.dynamic_segments:
+            if isinstance(segment, Node):
+                segments[index] = self.compiler.compile_element_exp(segment)
+            else:
+                segments[index] = segment.render(self.compiler, values)
+        return RawStr("".join(segments))
@@ -0,0 +1,444 @@
+"""Tracing and profiling of renderings.
+
+When no tracer is active, renderings use the plain compilers: tracing costs
+nothing. Inside :func:`trace` or :func:`profile` blocks, renderings use
+tracing subclasses of the compilers, which report the start and the end of
+each element and each component to the tracers.
+"""
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from hyccup.compiler import (
+    AsyncCompiler,
+    Compiler,
+    Element,
+    Node,
+    StackCompiler,
+    expand_tag_abb,
+    is_empty,
+    VOID_TAGS,
+    RawStr,
+    shared_compiler,
+    to_html,
+)
+from collections.abc import Iterator
+
+
+class Tracer:
+    """Receiver of the events of renderings.
+
+    Elements have the ``"tag"`` kind and their tag name as name. Components
+    defined with :func:`hyccup.definition.defhtml` or
+    :func:`hyccup.definition.defelem` have the ``"component"`` kind and the
+    qualified name of the function as name.
+    """
+
+    def on_element_start(self, kind, name):
+        """Called before the rendering of an element or a component."""
+
+    def on_element_end(self, kind, name, size):
+        """Called after the rendering of an element or a component.
+
+        ``size`` is the number of characters it emitted.
+        """
+
+
+class CallbackTracer(Tracer):
+    """Tracer calling the functions it is given."""
+
+    def __init__(self, on_element_start=None, on_element_end=None):
+        if on_element_start is not None:
+            self.on_element_start = on_element_start
+        if on_element_end is not None:
+            self.on_element_end = on_element_end
+
+
+class TraceState:
+    """Active tracers and components built while tracing."""
+
+    __slots__ = ("tracers", "components")
+
+    def __init__(self, tracers, components):
+        self.tracers = tracers
+        # elements returned by components and not compiled yet, by id, with
+        # the component names and the number of calls which returned them
+        self.components = components
+
+    def start(self, kind, name):
+        for tracer in self.tracers:
+            tracer.on_element_start(kind, name)
+
+    def end(self, kind, name, size):
+        for tracer in reversed(self.tracers):
+            tracer.on_element_end(kind, name, size)
+
+    def add_component(self, name, element):
+        """Record that element was returned by the component name."""
+        if isinstance(element, list):
+            entry = self.components.get(id(element))
+            calls = entry[2] if entry is not None and entry[1] is element else 0
+            self.components[id(element)] = (name, element, calls + 1)
+
+    def component_name(self, element):
+        """Return the name of the component which returned element, if any.
+
+        The element is compiled: it is forgotten once it has been compiled
+        as many times as it was returned, so that the state does not keep
+        the elements alive.
+        """
+        entry = self.components.get(id(element))
+        if entry is None or entry[1] is not element:
+            return None
+        name, _, calls = entry
+        if calls == 1:
+            del self.components[id(element)]
+        else:
+            self.components[id(element)] = (name, element, calls - 1)
+        return name
+
+    def call_component(self, name, render):
+        """Call render, the function rendering the component name, and trace it."""
+        self.start("component", name)
+        result = ""
+        try:
+            result = render()
+            return result
+        finally:
+            self.end("component", name, len(result))
+
+
+trace_state = ContextVar("trace_state", default=None)
+
+
+@contextmanager
+def trace(tracer=None, *, on_element_start=None, on_element_end=None):
+    """Send the events of the renderings done in the block to a tracer.
+
+    Pass a :class:`Tracer` or the ``on_element_start`` and ``on_element_end``
+    callbacks (see :class:`Tracer` for their arguments). Blocks can be nested,
+    events are then sent to all the active tracers.
+    """
+    if tracer is None:
+        tracer = CallbackTracer(on_element_start, on_element_end)
+    parent = trace_state.get()
+    if parent is None:
+        state = TraceState((tracer,), {})
+    else:
+        state = TraceState((*parent.tracers, tracer), parent.components)
+    token = trace_state.set(state)
+    try:
+        yield tracer
+    finally:
+        trace_state.reset(token)
+
+
+class ProfileStats:
+    """Statistics of a tag or a component.
+
+    The cumulative time and the size only count the outermost elements when
+    elements of the same name are nested. The self time excludes the time
+    spent in nested elements and components.
+    """
+
+    __slots__ = ("calls", "cumulative_time", "self_time", "size")
+
+    def __init__(self):
+        self.calls = 0
+        self.cumulative_time = 0.0
+        self.self_time = 0.0
+        self.size = 0
+
+    def __repr__(self):
+        return (
+            f"ProfileStats(calls={self.calls}, "
+            f"cumulative_time={self.cumulative_time:.6f}, "
+            f"self_time={self.self_time:.6f}, size={self.size})"
+        )
+
+
+class Profile(Tracer):
+    """Tracer collecting :class:`ProfileStats` by kind and name.
+
+    Times of the elements rendered by :func:`hyccup.core.iter_html` include
+    the time spent by the consumer of the chunks.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.stats = {}
+        self.stack = []
+        self.depths = {}
+
+    def on_element_start(self, kind, name):
+        key = (kind, name)
+        self.depths[key] = self.depths.get(key, 0) + 1
+        self.stack.append([key, self.clock(), 0.0])
+
+    def on_element_end(self, kind, name, size):
+        key, start, children_time = self.stack.pop()
+        elapsed = self.clock() - start
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = ProfileStats()
+        stats.calls += 1
+        stats.self_time += elapsed - children_time
+        self.depths[key] -= 1
+        if not self.depths[key]:
+            stats.cumulative_time += elapsed
+            stats.size += size
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    def report(self, sort="cumulative_time", limit=None):
+        """Return the statistics as a text table, sorted by decreasing sort."""
+        rows = sorted(
+            self.stats.items(), key=lambda item: getattr(item[1], sort), reverse=True
+        )
+        lines = [
+            f"{'kind':10} {'name':30} {'calls':>8} {'cumulative':>12} "
+            f"{'self':>12} {'size':>10}"
+        ]
+        for (kind, name), stats in rows[:limit]:
+            lines.append(
+                f"{kind:10} {name:30} {stats.calls:8} "
+                f"{stats.cumulative_time:12.6f} {stats.self_time:12.6f} "
+                f"{stats.size:10}"
+            )
+        return "\n".join(lines)
+
+
+@contextmanager
+def profile(clock=time.perf_counter):
+    """Profile the renderings done in the block, by tag and by component.
+
+    Yield a :class:`Profile` whose ``stats`` maps ``(kind, name)`` pairs to
+    :class:`ProfileStats`::
+
+        >>> with profile() as p:
+        ...     page = render_page()
+        >>> print(p.report(limit=10))
+    """
+    with trace(Profile(clock)) as profiler:
+        yield profiler
+
+
+class _CountingWriter:
+    """Writer counting the characters it writes."""
+
+    __slots__ = ("write", "size")
+
+    def __init__(self, write):
+        self.write = write
+        self.size = 0
+
+    def __call__(self, fragment):
+        self.size += len(fragment)
+        self.write(fragment)
+
+
+class TracingMixin:
+    """Report the elements and the components compiled to the trace state."""
+
+    def __init__(self, mode, escape_strings):
+        super().__init__(mode, escape_strings)
+        self.trace_state = trace_state.get()
+
+    def write_element_exp(self, exp, write):
+        name = isinstance(exp, list) and self.trace_state.component_name(exp)
+        if not name:
+            return super().write_element_exp(exp, write)
+        write = _counting_writer(write)
+        self.trace_state.start("component", name)
+        start = write.size
+        try:
+            super().write_element_exp(exp, write)
+        finally:
+            self.trace_state.end("component", name, write.size - start)
+
+    def write_element(self, write, tag, attrs, children):
+        write = _counting_writer(write)
+        tag_name = expand_tag_abb(tag)[0]
+        self.trace_state.start("tag", tag_name)
+        start = write.size
+        try:
+            super().write_element(write, tag, attrs, children)
+        finally:
+            self.trace_state.end("tag", tag_name, write.size - start)
+
+    def write_built_element(self, write, element):
+        write = _counting_writer(write)
+        self.trace_state.start("tag", element.tag_name)
+        start = write.size
+        try:
+            super().write_built_element(write, element)
+        finally:
+            self.trace_state.end("tag", element.tag_name, write.size - start)
+
+    def iter_built_element(self, element):
+        return self.trace_fragments(
+            "tag", element.tag_name, super().iter_built_element(element)
+        )
+
+    def iter_element_exp(self, exp):
+        name = isinstance(exp, list) and self.trace_state.component_name(exp)
+        if not name:
+            return super().iter_element_exp(exp)
+        return self.trace_fragments("component", name, super().iter_element_exp(exp))
+
+    def iter_list(self, element_list):
+        tag_name = expand_tag_abb(self.split_list(element_list)[0])[0]
+        return self.trace_fragments("tag", tag_name, super().iter_list(element_list))
+
+    def trace_fragments(self, kind, name, fragments):
+        """Trace the compilation of the fragments of an element."""
+        self.trace_state.start(kind, name)
+        size = 0
+        try:
+            for fragment in fragments:
+                size += len(fragment)
+                yield fragment
+        finally:
+            self.trace_state.end(kind, name, size)
+
+    def aiter_element_exp(self, exp):
+        name = isinstance(exp, list) and self.trace_state.component_name(exp)
+        if not name:
+            return super().aiter_element_exp(exp)
+        return self.atrace_fragments("component", name, super().aiter_element_exp(exp))
+
+    def aiter_list(self, element_list):
+        tag_name = expand_tag_abb(self.split_list(element_list)[0])[0]
+        return self.atrace_fragments("tag", tag_name, super().aiter_list(element_list))
+
+    async def atrace_fragments(self, kind, name, fragments):
+        """Trace the compilation of the async fragments of an element."""
+        self.trace_state.start(kind, name)
+        size = 0
+        try:
+            async for fragment in fragments:
+                size += len(fragment)
+                yield fragment
+        finally:
+            self.trace_state.end(kind, name, size)
+
+
+def _counting_writer(write):
+    return write if isinstance(write, _CountingWriter) else _CountingWriter(write)
+
+
+class TracingCompiler(TracingMixin, Compiler):
+    pass
+
+
+class TracingAsyncCompiler(TracingMixin, AsyncCompiler):
+    pass
+
+
+class _Exit:
+    """Stack entry ending an element or a component."""
+
+    __slots__ = ("kind", "name", "start", "closing_tag")
+
+    def __init__(self, kind, name, start, closing_tag=""):
+        self.kind = kind
+        self.name = name
+        self.start = start
+        self.closing_tag = closing_tag
+
+
+class TracingStackCompiler(TracingMixin, StackCompiler):
+    # everything is compiled, and traced, by iter_html
+    write_element_exp = StackCompiler.write_element_exp
+    write_element = StackCompiler.write_element
+    iter_element_exp = StackCompiler.iter_element_exp
+
+    def iter_html(self, *content):
+        """Compile HTML content with an explicit stack and trace it.
+
+        Same as :meth:`StackCompiler.iter_html`, with exit entries instead of
+        closing tags.
+        """
+        state = self.trace_state
+        stack = [iter(content)]
+        size = 0
+        while stack:
+            top = stack[-1]
+            if isinstance(top, _Exit):
+                stack.pop()
+                if top.closing_tag:
+                    size += len(top.closing_tag)
+                    yield top.closing_tag
+                state.end(top.kind, top.name, size - top.start)
+                continue
+
+            exp = next(top, _END)
+            if isinstance(exp, Element):
+                exp = exp.as_list()
+
+            if exp is _END:
+                stack.pop()
+            elif isinstance(exp, list):
+                component = state.component_name(exp)
+                if component:
+                    state.start("component", component)
+                    stack.append(_Exit("component", component, size))
+                tag, attrs, children = self.split_list(exp)
+                tag_name, formatted_attrs = self.element_head(tag, attrs)
+                state.start("tag", tag_name)
+
+                if is_empty(children):
+                    fragment = f"<{tag_name}{formatted_attrs}{self.empty_element_end(tag_name)}"
+                    stack.append(_Exit("tag", tag_name, size))
+                    size += len(fragment)
+                    yield fragment
+                    continue
+
+                if tag_name in VOID_TAGS:
+                    raise ValueError(f"'{tag_name}' cannot have children")
+
+                fragment = f"<{tag_name}{formatted_attrs}>"
+                stack.append(_Exit("tag", tag_name, size, f"</{tag_name}>"))
+                stack.append(iter(children))
+                size += len(fragment)
+                yield fragment
+            elif isinstance(exp, RawStr):
+                size += len(exp)
+                yield exp
+            elif isinstance(exp, Iterator):
+                stack.append(exp)
+            elif isinstance(exp, Node):
+                stack.append(iter((exp.expand(self),)))
+            elif exp is not None:
+                fragment = to_html(exp, self.mode, self.escape_strings)
+                size += len(fragment)
+                yield fragment
+
+
+_END = object()
+
+TRACING_CLASSES = {
+    Compiler: TracingCompiler,
+    AsyncCompiler: TracingAsyncCompiler,
+    StackCompiler: TracingStackCompiler,
+}
+
+
+@functools.cache
+def tracing_class(compiler_class):
+    """Return the tracing version of a compiler class."""
+    if compiler_class in TRACING_CLASSES:
+        return TRACING_CLASSES[compiler_class]
+    return type(f"Tracing{compiler_class.__name__}", (TracingMixin, compiler_class), {})
+
+
+def new_compiler(compiler_class, mode, escape_strings):
+    """Return the shared compiler_class instance, or a tracing one inside a trace block.
+
+    Tracing compilers hold the trace state, so they are created for each
+    rendering.
+    """
+    if trace_state.get() is None:
+        return shared_compiler(compiler_class, mode, escape_strings)
+    return tracing_class(compiler_class)(mode, escape_strings)
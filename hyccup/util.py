@@ -1,9 +1,7 @@
-from typing import Iterable
+from collections.abc import Iterable
 from contextlib import contextmanager
 from fractions import Fraction
 from urllib.parse import SplitResult, urlsplit, urlencode, quote_plus
-from functools import reduce
-from operator import add
 
 
 def to_str(obj):
@@ -28,18 +26,49 @@ def as_str(*obj):
     return "".join(map(to_str, obj))
 
 
+APOS_ENTITIES = {"html": "&apos;", "xhtml": "&apos;", "xml": "&apos;", "sgml": "&#39;"}
+"""Entity of the apostrophe for each mode."""
+
+
 def escape_html(string, mode, escape_strings):
-    """Change special characters into HTML character entities."""
+    """Change special characters into HTML character entities.
+
+    Strings without special characters are returned untouched. Otherwise only
+    the special characters present in the string are replaced.
+    """
     if not escape_strings:
         return string
 
-    return (
-        string.replace("&", "&amp;")
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-        .replace('"', "&quot;")
-        .replace("'", "&#39;" if str(mode) == "sgml" else "&apos;")
-    )
+    if "&" in string:
+        string = string.replace("&", "&amp;")
+    if "<" in string:
+        string = string.replace("<", "&lt;")
+    if ">" in string:
+        string = string.replace(">", "&gt;")
+    if '"' in string:
+        string = string.replace('"', "&quot;")
+    if "'" in string:
+        apos = APOS_ENTITIES.get(mode)
+        if apos is None:
+            apos = "&#39;" if str(mode) == "sgml" else "&apos;"
+        string = string.replace("'", apos)
+    return string
+
+
+def to_html(obj, mode, escape_strings=True, to_string=str):
+    """Convert obj to HTML.
+
+    Objects implementing the ``__html__`` protocol, like :class:`RawStr` or
+    the ``Markup`` strings of MarkupSafe, are already HTML: the result of
+    their ``__html__`` method is returned as is. Other objects are converted
+    to string with ``to_string`` and escaped with :hy:func:`escape-html`.
+    """
+    if type(obj) is str:
+        return escape_html(obj, mode, escape_strings)
+    html_method = getattr(obj, "__html__", None)
+    if html_method is not None:
+        return html_method()
+    return escape_html(to_string(obj), mode, escape_strings)
 
 
 class RawStr(str):
@@ -52,18 +81,159 @@ class RawStr(str):
 
     @classmethod
     def from_obj_or_iterable(cls, obj):
-        """Produce a raw string from an object or a collection."""
+        """Produce a raw string from an object or a collection.
+
+        Collections, possibly nested, are flattened and their elements are
+        concatenated in a single join. ``None`` produces an empty string.
+        """
         if obj is None:
             return RawStr("")
 
         if is_coll(obj):
-            return reduce(add, map(RawStr.from_obj_or_iterable, obj))
+            parts = []
+            _append_parts(parts, obj)
+            return RawStr("".join(parts))
 
         return RawStr(obj)
 
     def __add__(self, other):
         return RawStr(super().__add__(other))
 
+    def __html__(self):
+        return self
+
+
+def _append_parts(parts, coll):
+    """Append the string representations of the elements of coll to parts."""
+    for obj in coll:
+        if isinstance(obj, str):
+            parts.append(obj)
+        elif obj is None:
+            continue
+        elif is_coll(obj):
+            _append_parts(parts, obj)
+        else:
+            parts.append(str(obj))
+
+
+class RawBuilder:
+    """Accumulator of raw fragments, joined once by :meth:`build`.
+
+    Use it to assemble a large raw output piece by piece, instead of adding
+    raw strings, which copies the whole output at each addition::
+
+        >>> rows = RawBuilder()
+        >>> for row in cached_rows:
+        ...     rows.append(row)
+        >>> html(['table', rows.build()])
+
+    Appended objects are converted like with :hy:func:`hyccup.core.raw`.
+    """
+
+    __slots__ = ("parts", "size")
+
+    def __init__(self, *objs):
+        self.parts = []
+        self.size = 0
+        self.extend(objs)
+
+    def append(self, obj):
+        """Append an object or the elements of a collection."""
+        if isinstance(obj, str):
+            self.parts.append(obj)
+            self.size += len(obj)
+        elif obj is not None:
+            start = len(self.parts)
+            if is_coll(obj):
+                _append_parts(self.parts, obj)
+            else:
+                self.parts.append(str(obj))
+            self.size += sum(map(len, self.parts[start:]))
+
+    def extend(self, objs):
+        """Append each object of objs."""
+        for obj in objs:
+            self.append(obj)
+
+    def __iadd__(self, obj):
+        self.append(obj)
+        return self
+
+    def __len__(self):
+        return self.size
+
+    def build(self):
+        """Return the concatenation of the appended fragments.
+
+        :rtype: :class:`RawStr`
+        """
+        result = RawStr("".join(self.parts))
+        # keep the result, so that building again after more appends is cheap
+        self.parts = [result]
+        return result
+
+
+class FrozenAttrs(dict):
+    """Immutable attributes dictionary, subclass of ``dict``.
+
+    As it cannot change, its formatted attributes string is computed once for
+    each mode and tag abbreviation, and reused by the compiler. Use
+    :hy:func:`attrs` to create instances.
+
+    A list of classes is stored as a tuple, which renders the same way. Other
+    values are stored as is, so that they render like in a plain dict.
+    """
+
+    __slots__ = ("formatted",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(
+            (str(k), tuple(v) if k == "class" and isinstance(v, list) else v)
+            for k, v in dict(*args, **kwargs).items()
+        )
+        self.formatted = {}
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("'FrozenAttrs' object is immutable")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __hash__(self):
+        return hash(frozenset(self.items()))
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
+
+    def __repr__(self):
+        return f"attrs({super().__repr__()})"
+
+
+def attrs(mapping=(), /, **kwargs):
+    """Create an immutable attributes dictionary.
+
+    Use it for constant attributes, whose rendering is then computed only once.
+
+    .. tab:: Hy
+
+        .. code-block:: clj
+
+            => (setv submit-attrs (attrs {"class" "btn btn-primary" "type" "submit"}))
+            => (html ["button" submit-attrs "OK"])
+            "<button class=\"btn btn-primary\" type=\"submit\">OK</button>"
+
+    .. tab:: Python
+
+        .. code-block::
+
+            >>> SUBMIT_ATTRS = attrs({'class': 'btn btn-primary', 'type': 'submit'})
+            >>> html(['button', SUBMIT_ATTRS, 'OK'])
+            '<button class="btn btn-primary" type="submit">OK</button>'
+
+    :rtype: :class:`FrozenAttrs`
+    """
+    return FrozenAttrs(mapping, **kwargs)
+
 
 @contextmanager
 def base_url(url, /, encoding=None):
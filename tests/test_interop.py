@@ -4,6 +4,9 @@ Test especially hyccup.defdecos module.
 """
 
 import inspect
+import os
+import subprocess
+import sys
 
 from hy.models import Symbol as S
 import pytest
@@ -142,4 +145,16 @@ class TestGroup:
             ['input', {'id': 'outer-one', 'name': 'outer[one]', 'type': 'text', 'value': None}],
             ['input', {'id': 'outer-two', 'name': 'outer[two]', 'type': 'text', 'value': None}],
             ['input', {'id': 'outer-inner-three', 'name': 'outer[inner][three]', 'type': 'text', 'value': None}],
-            ['input', {'id': 'outer-inner-four', 'name': 'outer[inner][four]', 'type': 'text', 'value': None}]]
\ No newline at end of file
+            ['input', {'id': 'outer-inner-four', 'name': 'outer[inner][four]', 'type': 'text', 'value': None}]]
+
+
+def test_python_api_does_not_load_hy():
+    code = (
+        "import sys, hyccup, hyccup.element, hyccup.form, hyccup.page; "
+        "print(sorted({'hy', 'hyrule', 'asyncio'} & set(sys.modules)))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "[]"